@@ -3,11 +3,40 @@
 
 import adsk.core, adsk.fusion, adsk.cam, traceback
 import math
+import collections, json, logging, logging.handlers, os, threading, time
 
 _app: adsk.core.Application = None
 _ui: adsk.core.UserInterface = None
 _handlers = []
 
+# Handlers and temporary objects of the open command, released when it is destroyed
+_session = None
+
+# Preview state for the open command
+_previewEventId = 'irCleanChamferPreviewSettled'
+_previewCacheSize = 16
+_previewDelay = 0.4
+_previewCache = None
+_previewFailures = None
+_previewDebounce = None
+_previewGraphics = None
+_bodyIndex = None
+_chainCache = None
+_selectionSet = None
+_edgeSets = []
+_strokeTolerance = 0.001
+_minStitchTolerance = 0.0001
+_shortEdgeRatio = 0.1
+_editChamfers = []
+_attributeGroup = 'irCleanChamfer'
+_attributeName = 'parameters'
+_coplanarTolerance = 1e-6
+
+# Opt in profiling, written as one JSON line per run to a rotating log in the add-in folder
+_profileLogPath = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'Profile', 'clean-chamfer-profile.log')
+_profileLogSize = 1024 * 1024
+_profileLogCount = 3
+
 def run(context):
     try:
         global _app, _ui
@@ -28,7 +57,27 @@ def run(context):
         cleanChamferCreateCmdDef.commandCreated.add(onCommandCreated)
         _handlers.append(onCommandCreated)
 
+        # Create the command definition for editing a clean chamfer and add it next to the create button.
+        cleanChamferEditCmdDef = _ui.commandDefinitions.addButtonDefinition('irCleanChamferEdit', 'Edit Clean Chamfer', 'Changes the sizes of an existing clean chamfer in place.', 'Resources/Button')
+        createPanel.controls.addCommand(cleanChamferEditCmdDef, 'irCleanChamferCreate', False)
+
+        onEditCommandCreated = CCEditCommandCreatedHandler()
+        cleanChamferEditCmdDef.commandCreated.add(onEditCommandCreated)
+        _handlers.append(onEditCommandCreated)
+
+        # Create the command definition for batch runs and add it after the edit button.
+        cleanChamferBatchCmdDef = _ui.commandDefinitions.addButtonDefinition('irCleanChamferBatch', 'Clean Chamfer Batch', 'Clean chamfers every body in the documents listed in a batch config file.', 'Resources/Button')
+        createPanel.controls.addCommand(cleanChamferBatchCmdDef, 'irCleanChamferEdit', False)
+
+        onBatchCommandCreated = CCBatchCommandCreatedHandler()
+        cleanChamferBatchCmdDef.commandCreated.add(onBatchCommandCreated)
+        _handlers.append(onBatchCommandCreated)
 
+        # Connect the handler that recomputes the preview once value edits settle.
+        previewEvent = _app.registerCustomEvent(_previewEventId)
+        onPreviewSettled = PreviewSettledHandler()
+        previewEvent.add(onPreviewSettled)
+        _handlers.append(onPreviewSettled)
 
     except:
         if _ui:
@@ -48,6 +97,27 @@ def stop(context):
         if cleanChamferCreateCmdDef:
             cleanChamferCreateCmdDef.deleteMe()
 
+        editCntrl = createPanel.controls.itemById('irCleanChamferEdit')
+        if editCntrl:
+            editCntrl.deleteMe()
+
+        cleanChamferEditCmdDef = _ui.commandDefinitions.itemById('irCleanChamferEdit')
+        if cleanChamferEditCmdDef:
+            cleanChamferEditCmdDef.deleteMe()
+
+        batchCntrl = createPanel.controls.itemById('irCleanChamferBatch')
+        if batchCntrl:
+            batchCntrl.deleteMe()
+
+        cleanChamferBatchCmdDef = _ui.commandDefinitions.itemById('irCleanChamferBatch')
+        if cleanChamferBatchCmdDef:
+            cleanChamferBatchCmdDef.deleteMe()
+
+        EndSession()
+        _app.unregisterCustomEvent(_previewEventId)
+        _handlers.clear()
+        _profiler.close()
+
     except:
         if _ui:
             _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
@@ -86,36 +156,61 @@ class CCCreateCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             angleCmd.isMinimumValueInclusive = False
             angleCmd.isVisible = False
 
-            previewCmd = inputs.addBoolValueInput('preview', 'Preview Selection', True, "", True)
-
-
-            onPreSelect = PreSelectHandler()
-            cmd.preSelect.add(onPreSelect)
-            _handlers.append(onPreSelect)
-
-            onInputChanged = CreateInputChangedHandler()
-            cmd.inputChanged.add(onInputChanged)
-            _handlers.append(onInputChanged)
-
-            onExecutePreview = CreateExecutePreviewHandler()
-            cmd.executePreview.add(onExecutePreview)
-            _handlers.append(onExecutePreview)
-
-            onExecute = CreateExecuteHandler()
-            cmd.execute.add(onExecute)
-            _handlers.append(onExecute)
-
-            onPreSelectEnd = MyPreSelectEndHandler()
-            cmd.preSelectEnd.add(onPreSelectEnd)
-            _handlers.append(onPreSelectEnd)
+            # Keep the current edges and values as a set so several sizes go into one chamfer
+            inputs.addBoolValueInput('addEdgeSet', 'Add Edge Set', False, "", False)
+            inputs.addBoolValueInput('clearEdgeSets', 'Clear Edge Sets', False, "", False)
+            edgeSetsText = inputs.addTextBoxCommandInput('edgeSets', 'Edge Sets', '', 3, True)
+            edgeSetsText.isVisible = False
+
+            # Pick edges from whole bodies by rule instead of clicking them
+            autoGroup = inputs.addGroupCommandInput('autoGroup', 'Automatic Selection')
+            autoGroup.isExpanded = False
+            autoInputs = autoGroup.children
+            autoInputs.addBoolValueInput('autoSelect', 'Select by Rule', True, "", False)
+            bodySelInput = autoInputs.addSelectionInput('bodies', 'Bodies', 'Select the bodies to pick edges from.')
+            bodySelInput.addSelectionFilter('SolidBodies')
+            bodySelInput.setSelectionLimits(0)
+            autoInputs.addValueInput('minLength', 'Min Edge Length', des.unitsManager.defaultLengthUnits, adsk.core.ValueInput.createByString("0 in"))
+            autoInputs.addValueInput('maxLength', 'Max Edge Length', des.unitsManager.defaultLengthUnits, adsk.core.ValueInput.createByString("100 in"))
+            autoInputs.addAngleValueCommandInput('minAngle', 'Min Face Angle', adsk.core.ValueInput.createByString("60 Deg"))
+            autoInputs.addAngleValueCommandInput('maxAngle', 'Max Face Angle', adsk.core.ValueInput.createByString("120 Deg"))
+            autoInputs.addBoolValueInput('planarOnly', 'Planar Faces Only', True, "", False)
+
+            localStitchCmd = inputs.addBoolValueInput('localStitch', 'Local Patch', True, "", True)
+            localStitchCmd.tooltip = 'Replace the chamfer faces in place instead of stitching the whole body back together.'
+
+            baseFeatureCmd = inputs.addBoolValueInput('baseFeature', 'Base Feature', True, "", False)
+            baseFeatureCmd.tooltip = 'Keep only the finished body as a single non-parametric base feature so later edits do not recompute the chamfer.'
 
-            onSelect = MySelectHandler()
-            cmd.select.add(onSelect)
-            _handlers.append(onSelect) 
-            
-            onUnSelect = MyUnSelectHandler()
-            cmd.unselect.add(onUnSelect)            
-            _handlers.append(onUnSelect) 
+            previewCmd = inputs.addBoolValueInput('preview', 'Preview Selection', True, "", True)
+            fastPreviewCmd = inputs.addBoolValueInput('fastPreview', 'Fast Preview', True, "", False)
+            fastPreviewCmd.tooltip = 'Draw the chamfer boundaries without building the features until OK is clicked.'
+
+            profileCmd = inputs.addBoolValueInput('profile', 'Profile Runs', True, "", _profiler.enabled)
+            profileCmd.tooltip = 'Time each stage of the chamfer and write it to the profile log in the add-in folder.'
+            profileSummary = inputs.addTextBoxCommandInput('profileSummary', 'Last Run', _profiler.lastSummary.replace('\n', '<br>'), 8, True)
+            profileSummary.isVisible = _profiler.enabled
+
+            # Start a fresh preview cache, graphics and selection state for this command
+            global _previewCache, _previewFailures, _previewDebounce, _previewGraphics, _bodyIndex, _chainCache, _selectionSet, _edgeSets
+            session = StartSession()
+            _previewCache = PreviewCache(_previewCacheSize)
+            _previewFailures = PreviewCache(_previewCacheSize)
+            _previewDebounce = PreviewDebouncer(_previewDelay)
+            _previewGraphics = PreviewGraphics()
+            _bodyIndex = BodyIndex()
+            _chainCache = ChainCache(_bodyIndex)
+            _selectionSet = SelectionSet(_bodyIndex)
+            _edgeSets = []
+
+            # The handlers only live as long as this command
+            session.connect(cmd.preSelect, PreSelectHandler())
+            session.connect(cmd.inputChanged, CreateInputChangedHandler())
+            session.connect(cmd.executePreview, CreateExecutePreviewHandler())
+            session.connect(cmd.execute, CreateExecuteHandler())
+            session.connect(cmd.select, MySelectHandler())
+            session.connect(cmd.unselect, MyUnSelectHandler())
+            session.connect(cmd.destroy, SessionDestroyHandler())
 
         except:
             _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
@@ -126,29 +221,16 @@ class PreSelectHandler(adsk.core.SelectionEventHandler):
         super().__init__()
     def notify(self, args: adsk.core.SelectionEventArgs):
         try:
-            eventArgs = adsk.core.SelectionEventArgs.cast(args)
-            selectedEdge = adsk.fusion.BRepEdge.cast(eventArgs.selection.entity)
-            if selectedEdge and eventArgs.firingEvent.sender.commandInputs.itemById("chain").value:
-                args.additionalEntities = selectedEdge.tangentiallyConnectedEdges
+            with _profiler.phase('preSelect') as phase:
+                eventArgs = adsk.core.SelectionEventArgs.cast(args)
+                selectedEdge = adsk.fusion.BRepEdge.cast(eventArgs.selection.entity)
+                if selectedEdge and eventArgs.firingEvent.sender.commandInputs.itemById("chain").value:
+                    chainEdges = _chainCache.chain(selectedEdge)
+                    args.additionalEntities = chainEdges
+                    phase.size('chainEdges', chainEdges.count)
         except:
             _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
-class MyPreSelectEndHandler(adsk.core.SelectionEventHandler):
-    def __init__(self):
-        super().__init__()
-    def notify(self, args: adsk.core.SelectionEventArgs):
-        try:
-            design = adsk.fusion.Design.cast(_app.activeProduct)
-            selectedEdge = adsk.fusion.BRepEdge.cast(args.selection.entity) 
-            if design and selectedEdge:
-                for group in design.rootComponent.customGraphicsGroups:
-                    if group.id == str(selectedEdge.tempId):
-                        group.deleteMe()
-                        break       
-        except:
-            if _ui:
-                _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
-                
 class MySelectHandler(adsk.core.SelectionEventHandler):
     def __init__(self):
         super().__init__()
@@ -157,6 +239,13 @@ class MySelectHandler(adsk.core.SelectionEventHandler):
             selectedEdge = adsk.fusion.BRepEdge.cast(args.selection.entity) 
             if selectedEdge and args.activeInput:
                 args.activeInput.addSelection(selectedEdge)
+
+                # Track the edge and the chain that came with it
+                if args.firingEvent.sender.commandInputs.itemById("chain").value:
+                    for chainEdge in _chainCache.chain(selectedEdge):
+                        _selectionSet.add(chainEdge)
+                else:
+                    _selectionSet.add(selectedEdge)
         except:
             if _ui:
                 _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
@@ -166,14 +255,18 @@ class MyUnSelectHandler(adsk.core.SelectionEventHandler):
         super().__init__()
     def notify(self, args: adsk.core.SelectionEventArgs):
         try:
-            selectedEdge = adsk.fusion.BRepEdge.cast(args.selection.entity)
-            if selectedEdge and args.activeInput:
-                curEdges = GetEdgeCollection(args.activeInput)
-                args.activeInput.clearSelection()
-                curEdges.removeByIndex(selectedEdge)
-                args.activeInput.addSelection(curEdges)
-            
-            _ui.messageBox(str(args.selection.entity.objectType))
+            with _profiler.phase('unselect') as phase:
+                selectedEdge = adsk.fusion.BRepEdge.cast(args.selection.entity)
+                if selectedEdge and args.activeInput:
+                    _selectionSet.discard(selectedEdge)
+
+                    # Drop the rest of the chain one edge at a time instead of rebuilding the whole selection
+                    if args.firingEvent.sender.commandInputs.itemById("chain").value:
+                        activeSelections = _ui.activeSelections
+                        for chainEdge in _chainCache.chain(selectedEdge):
+                            if _selectionSet.discard(chainEdge):
+                                activeSelections.removeByEntity(chainEdge)
+                    phase.size('selection', len(_selectionSet))
 
         except:
             if _ui:
@@ -187,7 +280,36 @@ class CreateInputChangedHandler(adsk.core.InputChangedEventHandler):
             eventArgs = adsk.core.InputChangedEventArgs.cast(args)
             inputs = eventArgs.inputs
             cmdInput = eventArgs.input
-            
+
+            # Turn profiling on or off for the following runs
+            if cmdInput.id == 'profile':
+                _profiler.enabled = cmdInput.value
+                inputs.itemById('profileSummary').isVisible = cmdInput.value
+
+            # Store the selected edges and values as an edge set and start a new selection
+            if cmdInput.id == 'addEdgeSet':
+                cmdInputs = eventArgs.firingEvent.sender.commandInputs
+                edgeSel: adsk.core.SelectionCommandInput = cmdInputs.itemById('edges')
+                if edgeSel.selectionCount > 0:
+                    _edgeSets.append(EdgeSet([edgeSel.selection(i).entity for i in range(0, edgeSel.selectionCount)],
+                                             cmdInputs.itemById('width').value, cmdInputs.itemById('angle').value, cmdInputs.itemById('style').selectedItem.name))
+                    edgeSel.clearSelection()
+                    _selectionSet.edges.clear()
+                ShowEdgeSets(cmdInputs)
+
+            if cmdInput.id == 'clearEdgeSets':
+                _edgeSets.clear()
+                ShowEdgeSets(eventArgs.firingEvent.sender.commandInputs)
+
+            # Refill the edge selection when the rule or its bodies change
+            if cmdInput.id in ('autoSelect', 'bodies', 'minLength', 'maxLength', 'minAngle', 'maxAngle', 'planarOnly'):
+                cmdInputs = eventArgs.firingEvent.sender.commandInputs
+                if cmdInputs.itemById('autoSelect').value:
+                    AutoSelectEdges(cmdInputs)
+
+            # Hold off the full preview while values are being typed
+            if cmdInput.id in ('width', 'angle') and _previewDebounce:
+                _previewDebounce.touch()
 
             if cmdInput.id == "style":
                 angle: adsk.core.AngleValueCommandInput = inputs.itemById('angle')
@@ -233,6 +355,7 @@ class CreateExecutePreviewHandler(adsk.core.CommandEventHandler):
     def __init__(self):
         super().__init__()
     def notify(self, args):
+        _profiler.startRun('preview')
         try:
             eventArgs = adsk.core.CommandEventArgs.cast(args)
             cmd = eventArgs.command
@@ -240,242 +363,1606 @@ class CreateExecutePreviewHandler(adsk.core.CommandEventHandler):
 
             # Get the inputs.
             edgeSel: adsk.core.SelectionCommandInput = inputs.itemById('edges')
-            widthInput: adsk.core.ValueCommandInput = inputs.itemById('width')
-            angleInput: adsk.core.AngleValueCommandInput = inputs.itemById('angle')
-            typeInput: adsk.core.DropDownCommandInput = inputs.itemById('style')
             chainInput: adsk.core.BoolValueCommandInput = inputs.itemById("chain")
             previewInput: adsk.core.BoolValueCommandInput = inputs.itemById('preview')
+            fastPreviewInput: adsk.core.BoolValueCommandInput = inputs.itemById('fastPreview')
 
-            # Show the lines if they are not currently selecting them
+            # Draw the chamfer boundaries without building any features for the fast preview
             design = adsk.fusion.Design.cast(_app.activeProduct)
+            if design and fastPreviewInput.value == True:
+                with _profiler.phase('fastPreview') as phase:
+                    polylines = []
+                    for edgeSet in GetEdgeSets(inputs):
+                        widthA, widthB = ChamferOffsetWidths(edgeSet.widVal, edgeSet.angVal, edgeSet.typeVal)
+                        for edge in GetPreviewEdges(edgeSet.edges, chainInput.value):
+                            polylines.extend(SampleChamferBoundaries(edge, widthA, widthB))
+                    _previewGraphics.draw(design, polylines)
+                    phase.size('polylines', len(polylines))
+                return
+
+            # Show the lines if they are not currently selecting them
             if design and previewInput.value == True:
-                cggroup = design.rootComponent.customGraphicsGroups.add()
-                for i in range(0, edgeSel.selectionCount):
-                    edge = adsk.fusion.BRepEdge.cast(edgeSel.selection(i).entity)
-                    cgcurve = cggroup.addCurve(edge.geometry)
-                    cgcurve.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(0,127,255,255))
-                    cgcurve.weight = 2
-                    cgcurve.isSelectable = True
+                with _profiler.phase('previewGraphics') as phase:
+                    polylines = []
+                    for i in range(0, edgeSel.selectionCount):
+                        edge = adsk.fusion.BRepEdge.cast(edgeSel.selection(i).entity)
+                        polylines.append(StrokeEdge(edge, _strokeTolerance))
+                    _previewGraphics.draw(design, polylines)
+                    phase.size('edges', len(polylines))
+            else:
+                _previewGraphics.clear()
 
             # Preview if they have preview turned on and they are not currently selecting
             if previewInput.value == True:
-                # Create the Chamfer.
-                CreateChamfer(edgeSel, widthInput.value, angleInput.value, typeInput.selectedItem.name, chainInput.value)
+                # Wait for a burst of value edits to settle before rebuilding
+                if not _previewDebounce.isSettled():
+                    _previewDebounce.schedule(cmd)
+                    return
+
+                # Skip inputs that are already known to fail
+                key = PreviewKey(design, inputs)
+                if _previewCache.get(key) is False:
+                    return
+
+                # Create the Chamfer, leaving out the edges an earlier pass found to break it instead of bisecting them again
+                failingEdges = list(_previewFailures.get(key) or [])
+                success, skipped = CreateChamfer(GetEdgeSets(inputs), chainInput.value, inputs.itemById('localStitch').value, False, inputs.itemById('baseFeature').value, failingEdges)
+                _previewCache.put(key, success)
+                if failingEdges:
+                    _previewFailures.put(key, failingEdges)
+
+                # Keep a good preview as the result so OK does not rebuild it, unless edges were skipped and OK has to report them
+                eventArgs.isValidResult = success and skipped == 0
 
         except:
             _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+        finally:
+            if _profiler.endRun():
+                inputs.itemById('profileSummary').formattedText = _profiler.lastSummary.replace('\n', '<br>')
 
 
 class CreateExecuteHandler(adsk.core.CommandEventHandler):
     def __init__(self):
         super().__init__()
     def notify(self, args):
+        _profiler.startRun('execute')
         try:
             eventArgs = adsk.core.CommandEventArgs.cast(args)
             cmd = eventArgs.command
             inputs = cmd.commandInputs
 
             # Get the inputs.
-            edgeSel: adsk.core.SelectionCommandInput = inputs.itemById('edges')
-            widthInput: adsk.core.ValueCommandInput = inputs.itemById('width')
-            angleInput: adsk.core.AngleValueCommandInput = inputs.itemById('angle')
-            typeInput: adsk.core.DropDownCommandInput = inputs.itemById('style')
             chainInput: adsk.core.BoolValueCommandInput = inputs.itemById("chain")
 
-            # Create the Chamfer.
-            CreateChamfer(edgeSel, widthInput.value, angleInput.value, typeInput.selectedItem.name, chainInput.value)
+            # Create the Chamfer, leaving out the edges the preview already found to break it
+            failingEdges = list(_previewFailures.get(PreviewKey(_app.activeProduct, inputs)) or [])
+            CreateChamfer(GetEdgeSets(inputs), chainInput.value, inputs.itemById('localStitch').value, True, inputs.itemById('baseFeature').value, failingEdges)
+
+            # Time a full recompute so parametric and base feature runs can be compared in the profile
+            if _profiler.enabled:
+                with _profiler.phase('recompute'):
+                    adsk.fusion.Design.cast(_app.activeProduct).computeAll()
 
         except:
             _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+        finally:
+            if _profiler.endRun():
+                LogText(_profiler.lastSummary)
 
 
-# Get the Edges out of the Selection Component
-def GetEdgeCollection(edges: adsk.core.SelectionCommandInput):
-    edgeCollection: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-    for i in range(0, edges.selectionCount):
-        edgeCollection.add(edges.selection(i).entity)
-    return edgeCollection
+class SessionDestroyHandler(adsk.core.CommandEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            # Tear down everything the command left behind
+            released = EndSession()
+            counts = SessionCounts()
+            LogText('Clean Chamfer: released {} handlers, {} preview entities after {} redraws and {} collections, {} graphics groups left in the design'.format(
+                released['handlers'], released['entities'], released['redraws'], released['collections'], released['designGroups']))
+            LogText('Clean Chamfer: {} handlers, {} graphics groups and {} collections still live'.format(
+                counts['handlers'], counts['graphicsGroups'], counts['collections']))
+        except:
+            if _ui:
+                _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
-def CreateChamfer(edges: adsk.core.SelectionCommandInput, widVal: float, angVal: float, typeVal: str, chain: bool):
-    try:
-        chamferSucess = True
-        # Get the body the edges are part of.
-        originalBody: adsk.fusion.BRepBody = edges.selection(0).entity.body
 
-        # Get the Edges out of the Selection Component
-        edgeCollection: adsk.core.ObjectCollection = GetEdgeCollection(edges)
+# Event handler for the edit command created event.
+class CCEditCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            eventArgs = adsk.core.CommandCreatedEventArgs.cast(args)
+            des: adsk.fusion.Design = _app.activeProduct
+            cmd = eventArgs.command
+            inputs = cmd.commandInputs
 
-        # Copy the body
-        parentComponent: adsk.fusion.Component = originalBody.parentComponent
+            # List the clean chamfers in the design
+            global _editChamfers
+            session = StartSession()
+            _editChamfers = FindCleanChamfers(des)
+            chamferList = inputs.addDropDownCommandInput('cleanChamfer', 'Clean Chamfer', adsk.core.DropDownStyles.TextListDropDownStyle)
+            chamferList.isFullWidth = True
+            for i, (chamfer, parameters) in enumerate(_editChamfers):
+                chamferList.listItems.add(chamfer.name, i == 0, '')
+            if not _editChamfers:
+                inputs.addTextBoxCommandInput('noChamfers', '', 'There are no editable clean chamfers in this design.', 2, True)
 
-        # Create the Chamfer object.
-        chamfers: adsk.fusion.ChamferFeatures = parentComponent.features.chamferFeatures
-        try:
-            # Create the input for the chamfer feature
-            input = chamfers.createInput2()
-            if typeVal == "Equal Distance":
-                input.chamferEdgeSets.addEqualDistanceChamferEdgeSet(edgeCollection, adsk.core.ValueInput.createByReal(widVal), chain)
-            else:
-                input.chamferEdgeSets.addDistanceAndAngleChamferEdgeSet(edgeCollection, adsk.core.ValueInput.createByReal(widVal), adsk.core.ValueInput.createByReal(angVal), False, chain)
+            inputs.addGroupCommandInput('editEdgeSets', 'Edge Sets')
+            LoadEditInputs(inputs)
 
-            # Create the chamfer.
-            chamfer = chamfers.add(input)
+            session.connect(cmd.inputChanged, EditInputChangedHandler())
+            session.connect(cmd.execute, EditExecuteHandler())
+            session.connect(cmd.destroy, SessionDestroyHandler())
 
-            # Select the faces of the Chamfer
-            chamferFaces = chamfer.faces
+        except:
+            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
-            # Get the timeline Object of our first Feature
-            firstTLN: adsk.fusion.TimelineObject =  chamfer.timelineObject
 
+class EditInputChangedHandler(adsk.core.InputChangedEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            eventArgs = adsk.core.InputChangedEventArgs.cast(args)
+            if eventArgs.input.id == 'cleanChamfer':
+                LoadEditInputs(eventArgs.firingEvent.sender.commandInputs)
         except:
-            chamferSucess = False
-
-        if chamferSucess:
-            chamferEdges: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-            delFaces: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-            for face in chamferFaces:
-                for edge in face.edges:
-                    chamferEdges.add(edge)
-                delFaces.add(face)
-
-            patchLoopEdges: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-            for cEdge in chamferEdges:
-                qFaces = cEdge.faces
-                edgeLine = False
-
-                for qFace in qFaces:
-                    if not qFace in chamferFaces:
-                        edgeLine = True
-                if edgeLine:
-                    patchLoopEdges.add(cEdge)
-
-            firstLoopArr = []
-            secondLoopArr = []
-            useSecondLoop = False
-            for edge in patchLoopEdges:
-                if  edge in firstLoopArr or edge in secondLoopArr:
-                    pass
-                elif len(firstLoopArr) == 0:
-                    firstLoopArr.append(edge)
-                    tempprofile = edge.tangentiallyConnectedEdges
-                    startIndex = tempprofile.find(edge)
-                    profLen = tempprofile.count
-                    for i in range(startIndex+1,profLen):
-                        curEdge = tempprofile.item(i)
-                        if curEdge in patchLoopEdges and not curEdge in firstLoopArr:
-                            firstLoopArr.append(curEdge)
-                    for i in range(0, startIndex-1):
-                        curEdge = tempprofile.item(i)
-                        if curEdge in patchLoopEdges and not curEdge in firstLoopArr:
-                            firstLoopArr.append(curEdge)
-                elif (firstLoopArr[0].endVertex == firstLoopArr[-1].startVertex or firstLoopArr[-1].endVertex == firstLoopArr[0].startVertex):
-                    if len(secondLoopArr) == 0:
-                        useSecondLoop = True
-                        secondLoopArr.append(edge)
-                    tempprofile = edge.tangentiallyConnectedEdges
-                    startIndex = tempprofile.find(edge)
-                    profLen = tempprofile.count
-                    for i in range(startIndex+1,profLen):
-                        curEdge = tempprofile.item(i)
-                        if curEdge in patchLoopEdges and not curEdge in secondLoopArr:
-                            secondLoopArr.append(curEdge)
-                    for i in range(0, startIndex-1):
-                        curEdge = tempprofile.item(i)
-                        if curEdge in patchLoopEdges and not curEdge in secondLoopArr:
-                            secondLoopArr.append(curEdge)  
-
-            # Make the loops of contours of the area to be patched or lofted
-            firstLoop: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-            secondLoop: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-            edgeArr = []
-            for edge in firstLoopArr:
-                firstLoop.add(edge)
-            if useSecondLoop:
-                for edge in secondLoopArr:
-                    secondLoop.add(edge)
-            else:
-                for edgez in firstLoopArr:
-                    edge: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-                    edge.add(edgez)
-                    bEdge: adsk.fusion.Path = parentComponent.features.createPath(edge)
-                    edgeArr.append(bEdge)
-                    
-
-            firstLoopX: adsk.fusion.Path = parentComponent.features.createPath(firstLoop)
-            if useSecondLoop:
-                secondLoopX: adsk.fusion.Path = parentComponent.features.createPath(secondLoop)
-
-            # Create collection of surfaces to be stitched at the end
-            surfaces: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-
-            # Check if there is two separate loops to make a loft out of
-            if useSecondLoop:
-                # Create loft feature input
-                loftFeats: adsk.fusion.LoftFeatures = parentComponent.features.loftFeatures
-                loftInput = loftFeats.createInput(adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
-                loftSectionsObj = loftInput.loftSections
-                loftSectionsObj.add(firstLoopX)
-                loftSectionsObj.add(secondLoopX)
-                loftInput.isSolid = False
-
-                # Create loft feature
-                myLoft: adsk.fusion.LoftFeature = loftFeats.add(loftInput)
-
-                # Find the surface made by the loft
-                surface = loftFeats.item(0).bodies.item(0)
-                surfaces.add(surface)
-
-            # Create a loft with a split path if there is only one path
-            else:
-                # Create loft feature input
-                loftFeats: adsk.fusion.LoftFeatures = parentComponent.features.loftFeatures
-                loftInput = loftFeats.createInput(adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
-                loftSectionsObj = loftInput.loftSections
-                for edge in edgeArr:
-                    loftSectionsObj.add(edge)
-                loftInput.isSolid = False
+            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
-                # Create loft feature
-                myLoft: adsk.fusion.LoftFeature = loftFeats.add(loftInput)
 
-                # Find the surface made by the loft
-                surface = loftFeats.item(0).bodies.item(0)
-                surfaces.add(surface)
+class EditExecuteHandler(adsk.core.CommandEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        _profiler.startRun('edit')
+        try:
+            eventArgs = adsk.core.CommandEventArgs.cast(args)
+            inputs = eventArgs.command.commandInputs
+            chamferList: adsk.core.DropDownCommandInput = inputs.itemById('cleanChamfer')
+            if not _editChamfers or not chamferList.selectedItem:
+                return
+
+            chamfer, parameters = _editChamfers[chamferList.selectedItem.index]
+            values = []
+            for i, storedSet in enumerate(parameters['edgeSets']):
+                angleInput = inputs.itemById('editAngle{}'.format(i))
+                values.append((inputs.itemById('editWidth{}'.format(i)).value, angleInput.value if angleInput else storedSet['angle']))
+            UpdateCleanChamfer(chamfer, parameters, values)
+
+        except:
+            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+        finally:
+            if _profiler.endRun():
+                LogText(_profiler.lastSummary)
 
-            # Delete the chamfer faces
-            deletedFaces: adsk.fusion.SurfaceDeleteFaceFeatures = parentComponent.features.surfaceDeleteFaceFeatures
-            surfs = deletedFaces.add(delFaces)
 
-            # Get the bodies for the original body
-            mainbods = originalBody
-            bodyParts = surfs.bodies
-            surfaces.add(mainbods)
+# Event handler for the batch command created event. The command has no inputs, so Fusion executes it right away.
+class CCBatchCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            eventArgs = adsk.core.CommandCreatedEventArgs.cast(args)
+            cmd = eventArgs.command
+
+            session = StartSession()
+            session.connect(cmd.execute, BatchExecuteHandler())
+            session.connect(cmd.destroy, SessionDestroyHandler())
 
-            for face in bodyParts:
-                surfaces.add(face)
+        except:
+            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
-            # Create a stitch input to be able to define the input needed for an stitch.
-            stitches: adsk.fusion.StitchFeatures = parentComponent.features.stitchFeatures
 
-            # Define tolerance with 1 cm.
-            tolerance = adsk.core.ValueInput.createByReal(1.0)
+class BatchExecuteHandler(adsk.core.CommandEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            # Ask for the batch config
+            fileDialog = _ui.createFileDialog()
+            fileDialog.title = 'Clean Chamfer Batch Config'
+            fileDialog.filter = 'Batch config (*.json);;All files (*.*)'
+            fileDialog.isMultiSelectEnabled = False
+            if fileDialog.showOpen() != adsk.core.DialogResults.DialogOK:
+                return
+
+            report = RunBatchFile(fileDialog.filename)
+            failedDocs = [docReport for docReport in report['documents'] if docReport['error']]
+            bodyResults = [result for docReport in report['documents'] for result in docReport['bodies']]
+            failedBodies = [result for result in bodyResults if not result['success']]
+            summary = 'Clean chamfered {} of {} bodies in {} documents, {} documents failed.\nReport: {}'.format(
+                len(bodyResults) - len(failedBodies), len(bodyResults), len(report['documents']), len(failedDocs), report['report'])
+            LogText('Clean Chamfer: ' + summary.replace('\n', ' '))
+            _ui.messageBox(summary, 'Clean Chamfer Batch')
 
-            stitchInput = stitches.createInput(surfaces, tolerance, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+        except:
+            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
-            # Create a stitch feature.
-            stitch = stitches.add(stitchInput)
 
-            # Get the final timeline object
-            secondTLN: adsk.fusion.TimelineObject = stitch.timelineObject
+# Recompute the preview once the value edits have settled
+class PreviewSettledHandler(adsk.core.CustomEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            if _previewDebounce and _previewDebounce.command:
+                command = _previewDebounce.command
+                _previewDebounce.command = None
+                command.doExecutePreview()
+        except:
+            if _ui:
+                _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
 
-            # Put all the features in a timeline group
-            des = _app.activeProduct
-            tgs: adsk.fusion.TimelineGroups = des.timeline.timelineGroups
-            tg = tgs.add(firstTLN.index,secondTLN.index)
+# Handlers connected to the events of one command, disconnected together when it closes
+class CommandSession:
+    def __init__(self):
+        self.handlers = []
+
+    # Connect a handler and hold the reference Fusion needs to keep calling it
+    def connect(self, event: adsk.core.Event, handler):
+        event.add(handler)
+        self.handlers.append((event, handler))
+        return handler
+
+    # Disconnect every handler, returning how many were released
+    def release(self):
+        released = len(self.handlers)
+        for event, handler in self.handlers:
+            try:
+                event.remove(handler)
+            except:
+                pass
+        self.handlers = []
+        return released
+
+# Release whatever an earlier command left open and start a new session
+def StartSession():
+    global _session
+    EndSession()
+    _session = CommandSession()
+    return _session
+
+# Release the handlers, preview graphics and cached collections of the open command
+def EndSession():
+    global _session, _previewCache, _previewFailures, _previewDebounce, _previewGraphics, _bodyIndex, _chainCache, _selectionSet, _edgeSets, _editChamfers
+    released = {'handlers': 0, 'entities': 0, 'redraws': 0, 'designGroups': 0, 'collections': SessionCounts()['collections']}
+    if _session:
+        released['handlers'] = _session.release()
+    if _previewDebounce:
+        _previewDebounce.cancel()
+    if _previewGraphics:
+        counts = _previewGraphics.counts()
+        _previewGraphics.clear()
+        released['entities'] = counts['entities']
+        released['redraws'] = counts['redraws']
+        released['designGroups'] = _previewGraphics.counts()['designGroups']
+    _session = None
+    _previewCache = None
+    _previewFailures = None
+    _previewDebounce = None
+    _previewGraphics = None
+    _bodyIndex = None
+    _chainCache = None
+    _selectionSet = None
+    _edgeSets = []
+    _editChamfers = []
+    return released
+
+# Live handlers, graphics groups and cached collections, which should stay flat however often the commands are opened
+def SessionCounts():
+    collections = len(_edgeSets)
+    if _previewCache:
+        collections += len(_previewCache.entries)
+    if _previewFailures:
+        collections += len(_previewFailures.entries)
+    if _bodyIndex:
+        collections += len(_bodyIndex.bodies)
+    if _chainCache:
+        collections += len(set(id(chain) for chain in _chainCache.chains.values()))
+    return {
+        'handlers': len(_handlers) + (len(_session.handlers) if _session else 0),
+        'sessionHandlers': len(_session.handlers) if _session else 0,
+        'graphicsGroups': _previewGraphics.counts()['groups'] if _previewGraphics else 0,
+        'collections': collections
+    }
+
+# Owns the single custom graphics group used by the preview of one command
+class PreviewGraphics:
+    def __init__(self):
+        self.design = None
+        self.group = None
+        self.redraws = 0
+
+    # Replace the drawn polylines, reusing the group when it is still alive
+    def draw(self, design: adsk.fusion.Design, polylines):
+        if self.group and self.group.isValid and self.design == design:
+            while self.group.count > 0:
+                self.group.item(0).deleteMe()
         else:
-            pass
+            self.clear()
+            self.design = design
+            self.group = design.rootComponent.customGraphicsGroups.add()
+        DrawPolylines(self.group, polylines)
+        self.redraws += 1
+
+    def clear(self):
+        if self.group and self.group.isValid:
+            self.group.deleteMe()
+        self.group = None
+
+    # Live entity counts so it can be checked that the graphics stay flat
+    def counts(self):
+        live = self.group and self.group.isValid
+        designGroups = 0
+        if self.design and self.design.isValid:
+            designGroups = self.design.rootComponent.customGraphicsGroups.count
+        return {
+            'groups': 1 if live else 0,
+            'entities': self.group.count if live else 0,
+            'redraws': self.redraws,
+            'designGroups': designGroups
+        }
+
+# Key for an edge that is unique across bodies
+# Numbers the bodies one command has seen. A body's entity token can change, so bodies are matched with ==.
+class BodyIndex:
+    def __init__(self):
+        self.bodies = []
+
+    def find(self, body: adsk.fusion.BRepBody):
+        for bodyId, known in enumerate(self.bodies):
+            if known == body:
+                return bodyId
+        self.bodies.append(body)
+        return len(self.bodies) - 1
+
+# Key an edge on its body's number and its temp id, which is only unique within the body
+def EdgeKey(edge: adsk.fusion.BRepEdge, bodyIndex: BodyIndex, bodyId: int = None):
+    return (bodyIndex.find(edge.body) if bodyId is None else bodyId, edge.tempId)
+
+# Maps each edge to its tangent chain, cleared whenever the timeline changes
+class ChainCache:
+    def __init__(self, bodyIndex: BodyIndex):
+        self.bodyIndex = bodyIndex
+        self.chains = {}
+        self.state = None
+
+    def chain(self, edge: adsk.fusion.BRepEdge):
+        design: adsk.fusion.Design = edge.body.parentComponent.parentDesign
+        timeline = design.timeline
+        state = (timeline.count, timeline.markerPosition)
+        if state != self.state:
+            self.chains.clear()
+            self.state = state
+
+        bodyId = self.bodyIndex.find(edge.body)
+        chainEdges = self.chains.get(EdgeKey(edge, self.bodyIndex, bodyId))
+        if chainEdges is None or (chainEdges.count > 0 and not chainEdges.item(0).isValid):
+            # Every edge of the chain shares the same chain
+            chainEdges = edge.tangentiallyConnectedEdges
+            for chainEdge in chainEdges:
+                self.chains[EdgeKey(chainEdge, self.bodyIndex, bodyId)] = chainEdges
+        return chainEdges
+
+# Local mirror of the selected edges so selection changes only touch the edges they affect
+class SelectionSet:
+    def __init__(self, bodyIndex: BodyIndex):
+        self.bodyIndex = bodyIndex
+        self.edges = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.edges)
+
+    def __contains__(self, edge: adsk.fusion.BRepEdge):
+        return EdgeKey(edge, self.bodyIndex) in self.edges
+
+    def add(self, edge: adsk.fusion.BRepEdge):
+        self.edges[EdgeKey(edge, self.bodyIndex)] = edge
+
+    # Remove an edge, returning True if it was in the set
+    def discard(self, edge: adsk.fusion.BRepEdge):
+        return self.edges.pop(EdgeKey(edge, self.bodyIndex), None) is not None
+
+# Bounded least recently used map of preview inputs to their result. Fusion rolls preview features back between passes,
+# so only a known failure lets a pass skip the work. A known success still rebuilds.
+class PreviewCache:
+    def __init__(self, maxEntries: int):
+        self.maxEntries = maxEntries
+        self.entries = collections.OrderedDict()
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+# Merge a burst of input changes into one preview recompute
+class PreviewDebouncer:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lastChange = 0.0
+        self.command = None
+        self.timer = None
+
+    def touch(self):
+        self.lastChange = time.perf_counter()
+
+    def isSettled(self):
+        return time.perf_counter() - self.lastChange >= self.delay
+
+    def schedule(self, command: adsk.core.Command):
+        self.cancel()
+        self.command = command
+        wait = max(0.0, self.delay - (time.perf_counter() - self.lastChange))
+        self.timer = threading.Timer(wait, _app.fireCustomEvent, (_previewEventId,))
+        self.timer.daemon = True
+        self.timer.start()
+
+    def cancel(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        self.command = None
+
+# Key a preview on the selected edges, the values and the state of the design. Edge temp ids repeat across bodies, so edges are keyed with
+# their body's number in the command's body index.
+def PreviewKey(design: adsk.fusion.Design, inputs: adsk.core.CommandInputs):
+    edgeSets = tuple((tuple(sorted(EdgeKey(edge, _bodyIndex) for edge in edgeSet.edges)), round(edgeSet.widVal, 9), round(edgeSet.angVal, 9), edgeSet.typeVal)
+                     for edgeSet in GetEdgeSets(inputs))
+    timeline = design.timeline
+    return (edgeSets,
+            inputs.itemById('chain').value,
+            inputs.itemById('localStitch').value,
+            inputs.itemById('baseFeature').value,
+            timeline.count,
+            timeline.markerPosition)
+
+# Edges that share one chamfer width, angle and style
+class EdgeSet:
+    def __init__(self, edges, widVal: float, angVal: float, typeVal: str):
+        self.edges = edges
+        self.widVal = widVal
+        self.angVal = angVal
+        self.typeVal = typeVal
+
+# The stored edge sets plus the current selection with the current values
+def GetEdgeSets(inputs: adsk.core.CommandInputs):
+    edgeSets = list(_edgeSets)
+    edgeSel: adsk.core.SelectionCommandInput = inputs.itemById('edges')
+    if edgeSel.selectionCount > 0:
+        edgeSets.append(EdgeSet([edgeSel.selection(i).entity for i in range(0, edgeSel.selectionCount)],
+                                inputs.itemById('width').value, inputs.itemById('angle').value, inputs.itemById('style').selectedItem.name))
+    return edgeSets
+
+# List the stored edge sets in the dialog and let OK through with an empty selection once there are some
+def ShowEdgeSets(inputs: adsk.core.CommandInputs):
+    design: adsk.fusion.Design = _app.activeProduct
+    unitsManager = design.unitsManager
+    lines = []
+    for i, edgeSet in enumerate(_edgeSets):
+        size = unitsManager.formatInternalValue(edgeSet.widVal, unitsManager.defaultLengthUnits, True)
+        if edgeSet.typeVal != "Equal Distance":
+            size += ' at ' + unitsManager.formatInternalValue(edgeSet.angVal, 'deg', True)
+        lines.append('{}: {} edges, {}'.format(i + 1, len(edgeSet.edges), size))
+    edgeSetsText: adsk.core.TextBoxCommandInput = inputs.itemById('edgeSets')
+    edgeSetsText.formattedText = '<br>'.join(lines)
+    edgeSetsText.isVisible = len(lines) > 0
+    inputs.itemById('edges').setSelectionLimits(0 if _edgeSets else 1)
+
+# Split the edges of each edge set by body, in the context of the body's own component, giving each body its own edge sets
+def GroupEdgeSetsByBody(edgeSets):
+    # Entity tokens for one body can differ between reads, so bodies are matched with == instead.
+    # A selection only touches a few bodies, so scanning the list is cheap.
+    bodyGroups = []
+    for setIndex, edgeSet in enumerate(edgeSets):
+        for edge in edgeSet.edges:
+            if edge.assemblyContext:
+                edge = edge.nativeObject
+            body = edge.body
+            bodySets = None
+            for groupBody, groupSets in bodyGroups:
+                if groupBody == body:
+                    bodySets = groupSets
+                    break
+            if bodySets is None:
+                bodySets = {}
+                bodyGroups.append((body, bodySets))
+            if setIndex not in bodySets:
+                bodySets[setIndex] = EdgeSet([], edgeSet.widVal, edgeSet.angVal, edgeSet.typeVal)
+            bodySets[setIndex].edges.append(edge)
+    return [(body, list(bodySets.values())) for body, bodySets in bodyGroups]
+
+# Chamfer the edge sets from the dialog. Only the execute pass reports, so preview passes write nothing to the text commands.
+def CreateChamfer(edgeSets, chain: bool, localStitch: bool = True, report: bool = False, baseFeature: bool = False, failingEdges: list = None):
+    try:
+        results = CleanChamferEdgeSets(edgeSets, chain, localStitch, baseFeature, failingEdges)
+
+        # Summarize how each body went
+        skippedLines = []
+        for result in results:
+            for skip in result['skipped']:
+                skippedLines.append('{} / {}: edge {} ({})'.format(result['component'], result['body'], skip['edge'], skip['reason']))
+        if report:
+            for result in results:
+                LogText('Clean Chamfer: {} / {}: {} edges, {} in {:.2f} s'.format(
+                    result['component'], result['body'], result['edges'], 'done' if result['success'] else 'failed', result['seconds']))
+            for line in skippedLines:
+                LogText('Clean Chamfer: skipped ' + line)
+        for result in results:
+            if result['error'] and _ui:
+                _ui.messageBox('Failed:\n{}'.format(result['error']))
+        if report and skippedLines and _ui:
+            _ui.messageBox('Some edges could not be chamfered and were skipped:\n{}'.format('\n'.join(skippedLines)))
+        return len(results) > 0 and all(result['success'] for result in results), len(skippedLines)
 
     except:
         if _ui:
-            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
\ No newline at end of file
+            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+        return False, 0
+
+# Clean chamfer a list of edges without any dialog, returning the created features and timings for each body
+def CleanChamferEdges(edges, widVal: float, angVal: float, typeVal: str, chain: bool, localStitch: bool = True, baseFeature: bool = False):
+    return CleanChamferEdgeSets([EdgeSet(edges, widVal, angVal, typeVal)], chain, localStitch, baseFeature)
+
+# Clean chamfer several edge sets without any dialog, with one chamfer feature and one patch pass per body.
+# Edges in failingEdges are known to break the chamfer and are skipped up front, and edges found by bisection are added to it.
+def CleanChamferEdgeSets(edgeSets, chain: bool, localStitch: bool = True, baseFeature: bool = False, failingEdges: list = None):
+    # Run each body as its own chamfer so edges never end up in another component's features
+    results = []
+    for originalBody, bodySets in GroupEdgeSetsByBody(edgeSets):
+        result = {
+            'component': originalBody.parentComponent.name,
+            'body': originalBody.name,
+            'edges': sum(len(edgeSet.edges) for edgeSet in bodySets),
+            'edgeSets': len(bodySets),
+            'success': False,
+            'features': [],
+            'skipped': [],
+            'seconds': 0.0,
+            'error': None
+        }
+        startTime = time.perf_counter()
+        try:
+            # Drop the edges that local geometry says can't take the chamfer before paying for a feature
+            with _profiler.phase('preflight') as phase:
+                bodySets, skipped = PreflightEdgeSets(bodySets)
+                phase.size('skipped', len(skipped))
+
+            # Drop the edges an earlier run found to break the chamfer, so only new failures are bisected
+            knownFailing = [edge for edge in failingEdges or [] if edge.body == originalBody]
+            if knownFailing:
+                skipped += [(edge, 'chamfer failed') for edge in knownFailing]
+                bodySets = RemoveEdges(bodySets, knownFailing)
+
+            features = CreateBodyChamfer(originalBody, bodySets, chain, localStitch) if bodySets else None
+
+            # If the chamfer still fails, find the edges that break it and chamfer the rest
+            if features is None and bodySets:
+                with _profiler.phase('bisect') as phase:
+                    failing = BisectFailingEdges(originalBody.parentComponent, bodySets, chain)
+                    phase.size('failing', len(failing))
+                skipped += [(edge, 'chamfer failed') for edge in failing]
+                bodySets = RemoveEdges(bodySets, failing)
+                if failingEdges is not None:
+                    failingEdges.extend(failing)
+                if bodySets:
+                    features = CreateBodyChamfer(originalBody, bodySets, chain, localStitch)
+
+            # Swap the parametric features for the finished body in a base feature, otherwise keep what is needed to edit it later
+            if features is not None and baseFeature:
+                with _profiler.phase('baseFeature'):
+                    features = CommitAsBaseFeature(originalBody, features)
+            elif features is not None:
+                StoreCleanChamfer(features, bodySets, chain, localStitch)
+
+            result['skipped'] = [{'edge': edge.tempId, 'reason': reason} for edge, reason in skipped]
+            result['success'] = features is not None
+            result['features'] = features or []
+        except:
+            result['error'] = traceback.format_exc()
+        result['seconds'] = time.perf_counter() - startTime
+        results.append(result)
+    return results
+
+# Replace the features of a clean chamfer with a base feature holding the finished body and a remove feature for the original,
+# so upstream edits no longer recompute the chamfer. Designs without a timeline are already direct and are left as they are.
+def CommitAsBaseFeature(originalBody: adsk.fusion.BRepBody, features):
+    parentComponent: adsk.fusion.Component = originalBody.parentComponent
+    design: adsk.fusion.Design = parentComponent.parentDesign
+    if design.designType != adsk.fusion.DesignTypes.ParametricDesignType:
+        return features
+
+    # Copy the finished body, then take the features back out of the timeline
+    stitch = adsk.fusion.StitchFeature.cast(features[-1])
+    resultBody = stitch.bodies.item(0) if stitch else originalBody
+    bodyCopy = adsk.fusion.TemporaryBRepManager.get().copy(resultBody)
+    for feature in reversed(features):
+        feature.deleteMe()
+
+    baseFeat: adsk.fusion.BaseFeature = parentComponent.features.baseFeatures.add()
+    baseFeat.startEdit()
+    newBody = parentComponent.bRepBodies.add(bodyCopy, baseFeat)
+    baseFeat.finishEdit()
+    newBody.name = originalBody.name
+
+    removeFeat = parentComponent.features.removeFeatures.add(originalBody)
+    features = [baseFeat, removeFeat]
+    GroupTimeline(parentComponent, features)
+    return features
+
+# Save the values, edge references and patch features of a clean chamfer on its chamfer feature so it can be edited later
+def StoreCleanChamfer(features, edgeSets, chain: bool, localStitch: bool):
+    parameters = {
+        'edgeSets': [{
+            'width': edgeSet.widVal,
+            'angle': edgeSet.angVal,
+            'style': edgeSet.typeVal,
+            'edges': [edge.entityToken for edge in edgeSet.edges]
+        } for edgeSet in edgeSets],
+        'chain': chain,
+        'localStitch': localStitch,
+        'features': [feature.entityToken for feature in features[1:]]
+    }
+    features[0].attributes.add(_attributeGroup, _attributeName, json.dumps(parameters))
+
+# Find the chamfer features of the clean chamfers in a design along with their stored parameters
+def FindCleanChamfers(design: adsk.fusion.Design):
+    cleanChamfers = []
+    for attribute in design.findAttributes(_attributeGroup, _attributeName):
+        chamfer = adsk.fusion.ChamferFeature.cast(attribute.parent)
+        if chamfer:
+            cleanChamfers.append((chamfer, json.loads(attribute.value)))
+    return cleanChamfers
+
+# Fill the edit dialog with the values of the chosen clean chamfer
+def LoadEditInputs(inputs: adsk.core.CommandInputs):
+    edgeSetsGroup: adsk.core.GroupCommandInput = inputs.itemById('editEdgeSets')
+    children = edgeSetsGroup.children
+    while children.count > 0:
+        children.item(0).deleteMe()
+
+    chamferList: adsk.core.DropDownCommandInput = inputs.itemById('cleanChamfer')
+    if not _editChamfers or not chamferList.selectedItem:
+        return
+
+    design: adsk.fusion.Design = _app.activeProduct
+    chamfer, parameters = _editChamfers[chamferList.selectedItem.index]
+    for i, storedSet in enumerate(parameters['edgeSets']):
+        label = 'Set {} ({} edges)'.format(i + 1, len(storedSet['edges']))
+        children.addValueInput('editWidth{}'.format(i), label + ' Width', design.unitsManager.defaultLengthUnits, adsk.core.ValueInput.createByReal(storedSet['width']))
+        if storedSet['style'] != "Equal Distance":
+            angleCmd = children.addAngleValueCommandInput('editAngle{}'.format(i), label + ' Angle', adsk.core.ValueInput.createByReal(storedSet['angle']))
+            angleCmd.maximumValue = 0.5*math.pi
+            angleCmd.isMaximumValueInclusive = False
+            angleCmd.isMinimumValueInclusive = False
+
+# Change the sizes of a clean chamfer in place. The patch features follow the chamfer in the same recompute,
+# and are only rebuilt if that recompute leaves any of them broken.
+def UpdateCleanChamfer(chamfer: adsk.fusion.ChamferFeature, parameters: dict, values):
+    design: adsk.fusion.Design = chamfer.parentComponent.parentDesign
+
+    # Gather every changed size and set them together so the design recomputes once instead of once per parameter
+    changedParams = []
+    changedValues = []
+    with _profiler.phase('updateChamfer') as phase:
+        for i, (widVal, angVal) in enumerate(values):
+            storedSet = parameters['edgeSets'][i]
+            chamferSet = chamfer.edgeSets.item(i)
+            equalSet = adsk.fusion.EqualDistanceChamferEdgeSet.cast(chamferSet)
+            angleSet = adsk.fusion.DistanceAndAngleChamferEdgeSet.cast(chamferSet)
+            if abs(storedSet['width'] - widVal) > 1e-9:
+                changedParams.append((equalSet or angleSet).distance)
+                changedValues.append(adsk.core.ValueInput.createByReal(widVal))
+                storedSet['width'] = widVal
+            if angleSet and abs(storedSet['angle'] - angVal) > 1e-9:
+                changedParams.append(angleSet.angle)
+                changedValues.append(adsk.core.ValueInput.createByReal(angVal))
+                storedSet['angle'] = angVal
+        if changedParams:
+            design.modifyParameters(changedParams, changedValues)
+        phase.size('edgeSets', len(values))
+        phase.size('parameters', len(changedParams))
+    if not changedParams:
+        return
+
+    downstream = []
+    for token in parameters['features']:
+        found = design.findEntityByToken(token)
+        downstream.append(found[0] if found else None)
+    broken = any(feature is None or feature.healthState == adsk.fusion.FeatureHealthStates.ErrorFeatureHealthState for feature in downstream)
+
+    if broken:
+        with _profiler.phase('rebuildPatch'):
+            # Take the patch features out, keeping the chamfer, and rebuild them right after it
+            parentGroup = chamfer.timelineObject.parentGroup
+            if parentGroup:
+                parentGroup.deleteMe(False)
+            for feature in reversed(downstream):
+                if feature:
+                    feature.deleteMe()
+            chamfer.timelineObject.rollTo(False)
+            minWidth = min(storedSet['width'] for storedSet in parameters['edgeSets'])
+            patchFeatures = PatchChamfer(chamfer.bodies.item(0), chamfer, minWidth, parameters['localStitch'])
+            GroupTimeline(chamfer.parentComponent, [chamfer] + patchFeatures)
+            design.timeline.moveToEnd()
+            parameters['features'] = [feature.entityToken for feature in patchFeatures]
+
+    chamfer.attributes.itemByName(_attributeGroup, _attributeName).value = json.dumps(parameters)
+
+# Create one chamfer feature with a chamfer edge set for each edge set
+def AddChamfer(parentComponent: adsk.fusion.Component, edgeSets, chain: bool):
+    chamfers: adsk.fusion.ChamferFeatures = parentComponent.features.chamferFeatures
+
+    # Create the input for the chamfer feature
+    input = chamfers.createInput2()
+    for edgeSet in edgeSets:
+        edgeCollection: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
+        for edge in edgeSet.edges:
+            edgeCollection.add(edge)
+        if edgeSet.typeVal == "Equal Distance":
+            input.chamferEdgeSets.addEqualDistanceChamferEdgeSet(edgeCollection, adsk.core.ValueInput.createByReal(edgeSet.widVal), chain)
+        else:
+            input.chamferEdgeSets.addDistanceAndAngleChamferEdgeSet(edgeCollection, adsk.core.ValueInput.createByReal(edgeSet.widVal), adsk.core.ValueInput.createByReal(edgeSet.angVal), False, chain)
+
+    # Create the chamfer.
+    return chamfers.add(input)
+
+# Check why an edge can't take a chamfer from its local geometry, returning None if it looks fine
+def PreflightEdge(edge: adsk.fusion.BRepEdge, widthA: float, widthB: float):
+    if edge.length < _shortEdgeRatio * max(widthA, widthB):
+        return 'edge too short'
+    coEdges = edge.coEdges
+    if coEdges.count != 2:
+        return 'edge is not between two faces'
+    coEdgeA: adsk.fusion.BRepCoEdge = coEdges.item(0)
+    faceA: adsk.fusion.BRepFace = coEdgeA.loop.face
+    faceB: adsk.fusion.BRepFace = coEdges.item(1).loop.face
+
+    # Offset the middle of the edge into both faces and make sure the points are still on them
+    evaluator = edge.evaluator
+    ok, startParam, endParam = evaluator.getParameterExtents()
+    midParam = 0.5 * (startParam + endParam)
+    ok, point = evaluator.getPointAtParameter(midParam)
+    ok, derivative = evaluator.getFirstDerivative(midParam)
+    ok, normalA = faceA.evaluator.getNormalAtPoint(point)
+    ok, normalB = faceB.evaluator.getNormalAtPoint(point)
+    sign = -1.0 if coEdgeA.isOpposedToEdge else 1.0
+    tangent = (sign*derivative.x, sign*derivative.y, sign*derivative.z)
+    boundaryA, boundaryB = OffsetBoundaryPolylines([point.asArray()], [tangent], [normalA.asArray()], [normalB.asArray()], widthA, widthB)
+
+    for face, offsetPoint in ((faceA, boundaryA[0]), (faceB, boundaryB[0])):
+        faceEvaluator = face.evaluator
+        ok, param = faceEvaluator.getParameterAtPoint(adsk.core.Point3D.create(*offsetPoint))
+        if not ok or not faceEvaluator.isParameterOnFace(param):
+            return 'face too narrow'
+    return None
+
+# Split edge sets into the sets of edges that pass the pre-flight check and a list of (edge, reason) for the rest
+def PreflightEdgeSets(edgeSets):
+    passedSets = []
+    skipped = []
+    for edgeSet in edgeSets:
+        widthA, widthB = ChamferOffsetWidths(edgeSet.widVal, edgeSet.angVal, edgeSet.typeVal)
+        passed = []
+        for edge in edgeSet.edges:
+            reason = PreflightEdge(edge, widthA, widthB)
+            if reason:
+                skipped.append((edge, reason))
+            else:
+                passed.append(edge)
+        if passed:
+            passedSets.append(EdgeSet(passed, edgeSet.widVal, edgeSet.angVal, edgeSet.typeVal))
+    return passedSets, skipped
+
+# Remove edges from a list of edge sets, dropping sets left empty
+def RemoveEdges(edgeSets, edges):
+    removeIds = set(edge.tempId for edge in edges)
+    keptSets = []
+    for edgeSet in edgeSets:
+        kept = [edge for edge in edgeSet.edges if edge.tempId not in removeIds]
+        if kept:
+            keptSets.append(EdgeSet(kept, edgeSet.widVal, edgeSet.angVal, edgeSet.typeVal))
+    return keptSets
+
+# Try a chamfer on the edge sets and delete it again, returning whether it worked
+def ChamferSucceeds(parentComponent: adsk.fusion.Component, edgeSets, chain: bool):
+    try:
+        chamfer = AddChamfer(parentComponent, edgeSets, chain)
+    except:
+        return False
+    chamfer.deleteMe()
+    return True
+
+# Bisect the edges of edge sets whose chamfer has just failed to find the ones that make it fail
+def BisectFailingEdges(parentComponent: adsk.fusion.Component, edgeSets, chain: bool):
+    items = [(edgeSet, edge) for edgeSet in edgeSets for edge in edgeSet.edges]
+    return [edge for edgeSet, edge in BisectItems(parentComponent, items, chain)]
+
+# Put bisected edges back into their own sets so each keeps its size
+def ItemEdgeSets(items):
+    itemSets = collections.OrderedDict()
+    for edgeSet, edge in items:
+        itemSets.setdefault(id(edgeSet), EdgeSet([], edgeSet.widVal, edgeSet.angVal, edgeSet.typeVal)).edges.append(edge)
+    return list(itemSets.values())
+
+# Narrow down items that are known to fail together, trying each half on its own and only splitting the halves that fail
+def BisectItems(parentComponent: adsk.fusion.Component, items, chain: bool):
+    if len(items) == 1:
+        return items
+
+    middle = len(items) // 2
+    failing = []
+    for half in (items[:middle], items[middle:]):
+        if not ChamferSucceeds(parentComponent, ItemEdgeSets(half), chain):
+            failing += BisectItems(parentComponent, half, chain)
+
+    # Both halves work alone but not together, so the edges can't be separated
+    return failing if failing else items
+
+# Chamfer the edge sets of one body in a single feature and patch the chamfer, returning the created features or None if the chamfer failed
+def CreateBodyChamfer(originalBody: adsk.fusion.BRepBody, edgeSets, chain: bool, localStitch: bool = True):
+    # Copy the body
+    parentComponent: adsk.fusion.Component = originalBody.parentComponent
+
+    # Create the Chamfer object.
+    with _profiler.phase('chamfer') as phase:
+        phase.size('edges', sum(len(edgeSet.edges) for edgeSet in edgeSets))
+        phase.size('edgeSets', len(edgeSets))
+        try:
+            chamfer = AddChamfer(parentComponent, edgeSets, chain)
+        except:
+            return None
+
+    features = [chamfer] + PatchChamfer(originalBody, chamfer, min(edgeSet.widVal for edgeSet in edgeSets), localStitch)
+    GroupTimeline(parentComponent, features)
+    return features
+
+# Rebuild the faces of a chamfer as clean surfaces and put them back into the body, returning the features after the chamfer
+def PatchChamfer(originalBody: adsk.fusion.BRepBody, chamfer: adsk.fusion.ChamferFeature, minWidth: float, localStitch: bool = True):
+    parentComponent: adsk.fusion.Component = originalBody.parentComponent
+    features = []
+
+    # Select the faces of the Chamfer
+    chamferFaces = chamfer.faces
+
+    # Read the chamfer topology once so the classification below makes no more API calls
+    with _profiler.phase('snapshot') as phase:
+        snapshot = TopologySnapshot(chamferFaces)
+        phase.apiCalls = snapshot.apiCalls
+        phase.size('faces', len(snapshot.faces))
+        phase.size('edges', len(snapshot.edges))
+    if _profiler.enabled:
+        LogText('Clean Chamfer: topology snapshot made {} API calls, saving about {}'.format(snapshot.apiCalls, snapshot.apiCallsSaved))
+
+    delFaces: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
+    for face in snapshot.faces:
+        delFaces.add(face)
+
+    # Plan each independent chamfer region from the snapshot before touching the model
+    with _profiler.phase('plan') as phase:
+        plans = PlanRegions(snapshot)
+        boundaryLoops = [loop for plan in plans for loop in plan.loops]
+        phase.size('loops', len(boundaryLoops))
+        phase.size('regions', len(plans))
+
+    # Create collection of surfaces to be stitched at the end
+    surfaces: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
+
+    # Apply the plans one region at a time, patching flat regions and lofting the rest.
+    # Each kind is profiled on its own to compare rebuild time by face type.
+    lofts = []
+    for plan in plans:
+        with _profiler.phase('surface.' + plan.kind) as phase:
+            if plan.kind == 'patch':
+                loft = PatchLoop(parentComponent, snapshot, plan.loops[0])
+            else:
+                loft = LoftSections(parentComponent, snapshot, plan.sections)
+            phase.size('faces', len(plan.faceIds))
+        features.append(loft)
+        lofts.append(loft)
+        surfaces.add(loft.bodies.item(0))
+
+    # Replace the chamfer faces with the lofted surfaces in place so only the neighbouring faces change
+    if localStitch:
+        with _profiler.phase('replaceFaces') as phase:
+            replaceFeatures = ReplaceRegionFaces(parentComponent, snapshot, plans, lofts)
+            phase.size('faces', len(snapshot.faces))
+        if replaceFeatures is not None:
+            features.extend(replaceFeatures)
+            return features
+
+    # Delete the chamfer faces
+    with _profiler.phase('deleteFaces') as phase:
+        deletedFaces: adsk.fusion.SurfaceDeleteFaceFeatures = parentComponent.features.surfaceDeleteFaceFeatures
+        surfs = deletedFaces.add(delFaces)
+        features.append(surfs)
+        phase.size('faces', delFaces.count)
+
+    # Get the bodies for the original body
+    mainbods = originalBody
+    bodyParts = surfs.bodies
+    surfaces.add(mainbods)
+
+    for face in bodyParts:
+        surfaces.add(face)
+
+    # Create a stitch input to be able to define the input needed for an stitch.
+    stitches: adsk.fusion.StitchFeatures = parentComponent.features.stitchFeatures
+
+    # Keep the tolerance close to the size of the chamfer in local mode, otherwise use 1 cm.
+    if localStitch:
+        tolerance = adsk.core.ValueInput.createByReal(StitchTolerance(minWidth, snapshot, boundaryLoops))
+    else:
+        tolerance = adsk.core.ValueInput.createByReal(1.0)
+
+    with _profiler.phase('stitch') as phase:
+        stitchInput = stitches.createInput(surfaces, tolerance, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+
+        # Create a stitch feature.
+        stitch = stitches.add(stitchInput)
+        features.append(stitch)
+        phase.size('bodies', surfaces.count)
+
+    return features
+
+# Put the features from the first to the last in a timeline group
+def GroupTimeline(parentComponent: adsk.fusion.Component, features):
+    firstTLN: adsk.fusion.TimelineObject = features[0].timelineObject
+    secondTLN: adsk.fusion.TimelineObject = features[-1].timelineObject
+    des: adsk.fusion.Design = parentComponent.parentDesign
+    tgs: adsk.fusion.TimelineGroups = des.timeline.timelineGroups
+    return tgs.add(firstTLN.index, secondTLN.index)
+
+# Replace the faces of each chamfer region with its patch or loft and remove those bodies,
+# returning the new features or None with nothing left behind if any region can't be replaced
+def ReplaceRegionFaces(parentComponent: adsk.fusion.Component, snapshot: 'TopologySnapshot', plans, lofts):
+    replaceFaces: adsk.fusion.ReplaceFaceFeatures = parentComponent.features.replaceFaceFeatures
+    removeFeatures: adsk.fusion.RemoveFeatures = parentComponent.features.removeFeatures
+    features = []
+    try:
+        for plan, loft in zip(plans, lofts):
+            sourceFaces: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
+            for faceId in plan.faceIds:
+                sourceFaces.add(snapshot.faces[faceId])
+            replaceInput = replaceFaces.createInput(sourceFaces, False, loft.bodies.item(0))
+            features.append(replaceFaces.add(replaceInput))
+        for loft in lofts:
+            features.append(removeFeatures.add(loft.bodies.item(0)))
+    except:
+        for feature in reversed(features):
+            feature.deleteMe()
+        return None
+    return features
+
+# Stitch tolerance from the chamfer width and the shortest boundary edge so the stitch can't reach unrelated geometry
+def StitchTolerance(widVal: float, snapshot: 'TopologySnapshot', loops):
+    shortest = widVal
+    for loop in loops:
+        for edgeId in loop:
+            shortest = min(shortest, snapshot.edges[edgeId].length)
+    return max(_minStitchTolerance, min(0.1 * widVal, 0.25 * shortest))
+
+# Times one stage of a run and records the sizes it worked on. Fusion has no API call counter, so apiCalls stays None
+# unless the phase keeps its own tally, which only the topology snapshot does.
+class ProfilePhase:
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.apiCalls = None
+        self.sizes = {}
+
+    def __enter__(self):
+        self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        self.profiler.record(self.name, time.perf_counter() - self.startTime, self.apiCalls, self.sizes)
+        return False
+
+    def size(self, key: str, value: int):
+        self.sizes[key] = value
+
+# Stands in for a phase when profiling is off so the instrumented code costs next to nothing
+class NoProfilePhase:
+    apiCalls = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        return False
+
+    def size(self, key: str, value: int):
+        pass
+
+class Profiler:
+    def __init__(self, logPath: str):
+        self.enabled = False
+        self.logPath = logPath
+        self.logger = None
+        self.run = None
+        self.interactive = {}
+        self.lastSummary = ''
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _noProfilePhase
+        return ProfilePhase(self, name)
+
+    def startRun(self, name: str):
+        if self.enabled:
+            self.run = {'name': name, 'started': time.strftime('%Y-%m-%d %H:%M:%S'), 'startTime': time.perf_counter(), 'phases': []}
+
+    # Phases outside a run, like selection events, are totalled until the next run ends
+    def record(self, name: str, seconds: float, apiCalls: int, sizes: dict):
+        if self.run is not None:
+            self.run['phases'].append({'name': name, 'seconds': seconds, 'apiCalls': apiCalls, 'sizes': sizes})
+        else:
+            total = self.interactive.setdefault(name, {'count': 0, 'seconds': 0.0})
+            total['count'] += 1
+            total['seconds'] += seconds
+
+    # Finish the current run and write it to the log, returning False if there was no run
+    def endRun(self):
+        if self.run is None:
+            return False
+        run = self.run
+        self.run = None
+        run['seconds'] = time.perf_counter() - run.pop('startTime')
+        run['interactive'] = self.interactive
+        run['apiCallsCounted'] = [phase['name'] for phase in run['phases'] if phase['apiCalls'] is not None]
+        self.interactive = {}
+        self.lastSummary = FormatProfile(run)
+        self.write(run)
+        return True
+
+    def write(self, run: dict):
+        if not self.logger:
+            os.makedirs(os.path.dirname(self.logPath), exist_ok=True)
+            self.logger = logging.getLogger('irCleanChamferProfile')
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+            self.logger.addHandler(logging.handlers.RotatingFileHandler(self.logPath, maxBytes=_profileLogSize, backupCount=_profileLogCount))
+        self.logger.info(json.dumps(run))
+
+    def close(self):
+        if self.logger:
+            for handler in list(self.logger.handlers):
+                handler.close()
+                self.logger.removeHandler(handler)
+            self.logger = None
+
+# Summarize a profiled run as a few lines of text for the dialog, saying which phases counted their API calls
+def FormatProfile(run: dict):
+    lines = ['{} {:.3f} s'.format(run['name'], run['seconds'])]
+    countedPhases = []
+    for phase in run['phases']:
+        details = ', '.join('{} {}'.format(key, value) for key, value in phase['sizes'].items())
+        if phase['apiCalls'] is not None:
+            details = 'api {}{}'.format(phase['apiCalls'], ', ' + details if details else '')
+            if phase['name'] not in countedPhases:
+                countedPhases.append(phase['name'])
+        lines.append('{}: {:.3f} s{}'.format(phase['name'], phase['seconds'], ' (' + details + ')' if details else ''))
+    for name, total in run['interactive'].items():
+        lines.append('{}: {} events, {:.3f} s'.format(name, total['count'], total['seconds']))
+    if countedPhases:
+        lines.append('api calls are only counted for: {}'.format(', '.join(countedPhases)))
+    return '\n'.join(lines)
+
+_noProfilePhase = NoProfilePhase()
+_profiler = Profiler(_profileLogPath)
+
+# Write a line to the Text Commands palette
+def LogText(text: str):
+    palette = _ui.palettes.itemById('TextCommands') if _ui else None
+    if palette:
+        palette.writeText(text)
+
+# Local copy of the faces, edges and vertices of a set of faces with integer ids
+class TopologySnapshot:
+    def __init__(self, faces):
+        self.faces = []
+        self.faceTypes = []
+        self.facePlanes = []
+        self.faceEdges = []
+        self.edges = []
+        self.edgeVerts = []
+        self.edgeFaces = []
+        self.edgeIds = {}
+        self.vertexIds = {}
+        self.apiCalls = 0
+        self.naiveApiCalls = 0
+
+        faceIds = {}
+        edgeFaceKeys = []
+        for face in faces:
+            faceIds[face.tempId] = len(self.faces)
+            self.faces.append(face)
+            geometry = face.geometry
+            self.faceTypes.append(geometry.surfaceType)
+            self.facePlanes.append(self.readPlane(geometry))
+            self.faceEdges.append([])
+            self.apiCalls += 3
+        faceCount = len(self.faces)
+
+        for faceId, face in enumerate(self.faces):
+            self.apiCalls += 1
+            self.naiveApiCalls += 1
+            for edge in face.edges:
+                self.apiCalls += 1
+                self.naiveApiCalls += 1
+                edgeKey = edge.tempId
+                edgeId = self.edgeIds.get(edgeKey)
+                if edgeId is None:
+                    edgeId = len(self.edges)
+                    self.edgeIds[edgeKey] = edgeId
+                    self.edges.append(edge)
+                    self.edgeVerts.append((self.readVertexId(edge.startVertex), self.readVertexId(edge.endVertex)))
+                    faceKeys = [edgeFace.tempId for edgeFace in edge.faces]
+                    edgeFaceKeys.append(faceKeys)
+                    self.apiCalls += 3 + len(faceKeys)
+                    self.naiveApiCalls += 1 + len(faceKeys) * (1 + faceCount)
+                self.faceEdges[faceId].append(edgeId)
+
+        # Store the incident faces as face ids, with -1 for faces outside the snapshot
+        for faceKeys in edgeFaceKeys:
+            self.edgeFaces.append([faceIds.get(faceKey, -1) for faceKey in faceKeys])
+
+    # Unit normal and offset from the origin of a planar face, or None for any other surface
+    def readPlane(self, geometry: adsk.core.Surface):
+        self.apiCalls += 1
+        if geometry.surfaceType != adsk.core.SurfaceTypes.PlaneSurfaceType:
+            return None
+        self.apiCalls += 4
+        plane = adsk.core.Plane.cast(geometry)
+        normal = Normalize(plane.normal.asArray())
+        return normal, Dot(normal, plane.origin.asArray())
+
+    def readVertexId(self, vertex):
+        self.apiCalls += 1
+        return self.vertexIds.setdefault(vertex.tempId, len(self.vertexIds))
+
+    # Estimated number of API calls saved against classifying the edges through the API
+    @property
+    def apiCallsSaved(self):
+        return max(0, self.naiveApiCalls - self.apiCalls)
+
+# Walk one loop of boundary edges starting from a vertex, marking each edge as visited
+def WalkLoop(edgeVerts: dict, vertexEdges: dict, visited: set, vertexId, edgeId):
+    loop = []
+    while edgeId is not None:
+        visited.add(edgeId)
+        loop.append(edgeId)
+        startId, endId = edgeVerts[edgeId]
+        vertexId = endId if startId == vertexId else startId
+        edgeId = None
+        for nextId in vertexEdges[vertexId]:
+            if nextId not in visited:
+                edgeId = nextId
+                break
+    return loop
+
+# Order the boundary edges into open or closed loops using a vertex adjacency graph keyed on edge ids
+def BuildBoundaryLoops(snapshot: TopologySnapshot, loopEdgeIds):
+    edgeVerts = {}
+    vertexEdges = {}
+    for edgeId in loopEdgeIds:
+        if edgeId in edgeVerts:
+            continue
+        startId, endId = snapshot.edgeVerts[edgeId]
+        edgeVerts[edgeId] = (startId, endId)
+        vertexEdges.setdefault(startId, []).append(edgeId)
+        if endId != startId:
+            vertexEdges.setdefault(endId, []).append(edgeId)
+
+    loops = []
+    visited = set()
+
+    # Start open loops from their free ends so they come out in order
+    for vertexId, vertEdgeIds in vertexEdges.items():
+        if len(vertEdgeIds) == 1 and vertEdgeIds[0] not in visited:
+            loops.append(WalkLoop(edgeVerts, vertexEdges, visited, vertexId, vertEdgeIds[0]))
+
+    # Everything left over is part of a closed loop
+    for edgeId in edgeVerts:
+        if edgeId not in visited:
+            loops.append(WalkLoop(edgeVerts, vertexEdges, visited, edgeVerts[edgeId][0], edgeId))
+
+    return loops
+
+# Find the root of a key in a union find map
+def FindRoot(parents, key):
+    root = key
+    while parents[root] != root:
+        root = parents[root]
+    while parents[key] != root:
+        parents[key], key = root, parents[key]
+    return root
+
+# Split the snapshot's faces into connected chamfer regions, one per independent chain
+def GroupFacesByRegion(snapshot: TopologySnapshot):
+    parents = list(range(len(snapshot.faces)))
+    for faceIds in snapshot.edgeFaces:
+        innerIds = [faceId for faceId in faceIds if faceId != -1]
+        for faceId in innerIds[1:]:
+            parents[FindRoot(parents, faceId)] = FindRoot(parents, innerIds[0])
+
+    regions = {}
+    for faceId in range(len(snapshot.faces)):
+        regions.setdefault(FindRoot(parents, faceId), []).append(faceId)
+    return list(regions.values())
+
+# Whether two face planes are the same plane, whichever way they face
+def SamePlane(planeA, planeB):
+    normalA, offsetA = planeA
+    normalB, offsetB = planeB
+    alignment = Dot(normalA, normalB)
+    return abs(abs(alignment) - 1.0) < _coplanarTolerance and abs(offsetA - math.copysign(1.0, alignment) * offsetB) < _coplanarTolerance
+
+# Pure data plan for patching one chamfer region: its faces, boundary loops, loft sections and the kind of surface to build.
+# A region with one loop whose faces all lie in one plane is rebuilt with a patch, and anything else is lofted.
+class RegionPlan:
+    def __init__(self, faceIds, loops, facePlanes):
+        self.faceIds = faceIds
+        self.loops = loops
+
+        # Loft between the loops if there are separate loops, otherwise split the single loop into one section per edge
+        if len(loops) > 1:
+            self.sections = loops
+        else:
+            self.sections = [[edgeId] for edgeId in loops[0]]
+
+        # A chain of planar faces can still turn corners, so only patch when every face shares the first face's plane
+        if len(loops) == 1 and facePlanes[0] and all(plane and SamePlane(plane, facePlanes[0]) for plane in facePlanes[1:]):
+            self.kind = 'patch'
+        else:
+            self.kind = 'loft'
+
+# Plan one chamfer region from the snapshot alone
+def PlanRegion(snapshot: TopologySnapshot, faceIds):
+    boundaryIds = []
+    for faceId in faceIds:
+        for edgeId in snapshot.faceEdges[faceId]:
+            if -1 in snapshot.edgeFaces[edgeId]:
+                boundaryIds.append(edgeId)
+    loops = BuildBoundaryLoops(snapshot, boundaryIds)
+    if not loops:
+        return None
+    return RegionPlan(faceIds, loops, [snapshot.facePlanes[faceId] for faceId in faceIds])
+
+# Plan every chamfer region. Each region is planned on its own so one bad chain can't disturb the others.
+def PlanRegions(snapshot: TopologySnapshot):
+    plans = [PlanRegion(snapshot, faceIds) for faceIds in GroupFacesByRegion(snapshot)]
+    return [plan for plan in plans if plan]
+
+# Patch a planar surface across a single closed loop and return the patch feature
+def PatchLoop(parentComponent: adsk.fusion.Component, snapshot: TopologySnapshot, loop):
+    loopEdges: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
+    for edgeId in loop:
+        loopEdges.add(snapshot.edges[edgeId])
+    loopPath: adsk.fusion.Path = parentComponent.features.createPath(loopEdges)
+
+    patches: adsk.fusion.PatchFeatures = parentComponent.features.patchFeatures
+    patchInput = patches.createInput(loopPath, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    return patches.add(patchInput)
+
+# Loft a surface through the sections of a region plan and return the loft feature
+def LoftSections(parentComponent: adsk.fusion.Component, snapshot: TopologySnapshot, sections):
+    # Create loft feature input
+    loftFeats: adsk.fusion.LoftFeatures = parentComponent.features.loftFeatures
+    loftInput = loftFeats.createInput(adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    loftSectionsObj = loftInput.loftSections
+
+    for section in sections:
+        sectionEdges: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
+        for edgeId in section:
+            sectionEdges.add(snapshot.edges[edgeId])
+        sectionPath: adsk.fusion.Path = parentComponent.features.createPath(sectionEdges)
+        loftSectionsObj.add(sectionPath)
+    loftInput.isSolid = False
+
+    # Create loft feature
+    myLoft: adsk.fusion.LoftFeature = loftFeats.add(loftInput)
+    return myLoft
+
+
+# Get the unique edges, expanded to their tangent chains if chaining is on
+def GetPreviewEdges(edges, chain: bool):
+    previewEdges = {}
+    for edge in edges:
+        edge = adsk.fusion.BRepEdge.cast(edge)
+        if not edge:
+            continue
+        chainEdges = edge.tangentiallyConnectedEdges if chain else [edge]
+        for chainEdge in chainEdges:
+            previewEdges.setdefault(chainEdge.tempId, chainEdge)
+    return list(previewEdges.values())
+
+# Distances the chamfer runs into the first and second face of an edge
+def ChamferOffsetWidths(widVal: float, angVal: float, typeVal: str):
+    if typeVal == "Equal Distance":
+        return widVal, widVal
+    return widVal, widVal * math.tan(angVal)
+
+def Cross(a, b):
+    return (a[1]*b[2] - a[2]*b[1], a[2]*b[0] - a[0]*b[2], a[0]*b[1] - a[1]*b[0])
+
+def Normalize(a):
+    length = math.sqrt(a[0]*a[0] + a[1]*a[1] + a[2]*a[2])
+    if length == 0:
+        return a
+    return (a[0]/length, a[1]/length, a[2]/length)
+
+# Offset the sampled points of an edge into both of its faces to get the two chamfer boundary polylines.
+# The tangents follow the edge's direction in the first face, so each face lies to the left of its coedge.
+def OffsetBoundaryPolylines(points, tangents, normalsA, normalsB, widthA: float, widthB: float):
+    boundaryA = []
+    boundaryB = []
+    for point, tangent, normalA, normalB in zip(points, tangents, normalsA, normalsB):
+        dirA = Normalize(Cross(normalA, tangent))
+        dirB = Normalize(Cross(tangent, normalB))
+        boundaryA.append((point[0] + widthA*dirA[0], point[1] + widthA*dirA[1], point[2] + widthA*dirA[2]))
+        boundaryB.append((point[0] + widthB*dirB[0], point[1] + widthB*dirB[1], point[2] + widthB*dirB[2]))
+    return boundaryA, boundaryB
+
+# Sample an edge and its two faces and return the chamfer boundary polylines
+def SampleChamferBoundaries(edge: adsk.fusion.BRepEdge, widthA: float, widthB: float):
+    coEdges = edge.coEdges
+    if coEdges.count != 2:
+        return []
+    coEdgeA: adsk.fusion.BRepCoEdge = coEdges.item(0)
+    faceA: adsk.fusion.BRepFace = coEdgeA.loop.face
+    faceB: adsk.fusion.BRepFace = coEdges.item(1).loop.face
+
+    # Stroke the edge finely compared to the chamfer width
+    evaluator = edge.evaluator
+    ok, startParam, endParam = evaluator.getParameterExtents()
+    ok, strokePoints = evaluator.getStrokes(startParam, endParam, max(0.05 * min(widthA, widthB), 0.0001))
+    if not ok or len(strokePoints) < 2:
+        return []
+    ok, params = evaluator.getParametersAtPoints(strokePoints)
+    ok, derivatives = evaluator.getFirstDerivatives(params)
+    ok, faceNormalsA = faceA.evaluator.getNormalsAtPoints(strokePoints)
+    ok, faceNormalsB = faceB.evaluator.getNormalsAtPoints(strokePoints)
+
+    sign = -1.0 if coEdgeA.isOpposedToEdge else 1.0
+    points = [(point.x, point.y, point.z) for point in strokePoints]
+    tangents = [(sign*vector.x, sign*vector.y, sign*vector.z) for vector in derivatives]
+    normalsA = [(vector.x, vector.y, vector.z) for vector in faceNormalsA]
+    normalsB = [(vector.x, vector.y, vector.z) for vector in faceNormalsB]
+    return list(OffsetBoundaryPolylines(points, tangents, normalsA, normalsB, widthA, widthB))
+
+# Stroke an edge into a polyline
+def StrokeEdge(edge: adsk.fusion.BRepEdge, tolerance: float):
+    evaluator = edge.evaluator
+    ok, startParam, endParam = evaluator.getParameterExtents()
+    ok, strokePoints = evaluator.getStrokes(startParam, endParam, tolerance)
+    if not ok:
+        return []
+    return [(point.x, point.y, point.z) for point in strokePoints]
+
+# Draw all the polylines as a single custom graphics line entity
+def DrawPolylines(cggroup: adsk.fusion.CustomGraphicsGroup, polylines):
+    coords = []
+    indexList = []
+    for polyline in polylines:
+        first = len(coords) // 3
+        for point in polyline:
+            coords.extend(point)
+        for i in range(first, first + len(polyline) - 1):
+            indexList.extend((i, i + 1))
+    if not indexList:
+        return None
+
+    cglines = cggroup.addLines(adsk.fusion.CustomGraphicsCoordinates.create(coords), indexList, False)
+    cglines.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(0,127,255,255))
+    cglines.weight = 2
+    return cglines
+
+
+def Dot(a, b):
+    return a[0]*b[0] + a[1]*b[1] + a[2]*b[2]
+
+# Edge lengths, midpoints, tangents and face normals of a body, read once so many edges can be classified in one pass.
+# The tangents follow the edge's direction in its first face, as in OffsetBoundaryPolylines.
+class EdgeTable:
+    def __init__(self, body: adsk.fusion.BRepBody):
+        self.edges = []
+        self.lengths = []
+        self.linear = []
+        self.planar = []
+        self.midpoints = []
+        self.tangents = []
+        self.normalsA = []
+        self.normalsB = []
+
+        # Planar faces have one normal, so only read it once per face
+        planeNormals = {}
+        for edge in body.edges:
+            coEdges = edge.coEdges
+            if coEdges.count != 2:
+                continue
+            coEdgeA: adsk.fusion.BRepCoEdge = coEdges.item(0)
+            faceA: adsk.fusion.BRepFace = coEdgeA.loop.face
+            faceB: adsk.fusion.BRepFace = coEdges.item(1).loop.face
+
+            evaluator = edge.evaluator
+            ok, startParam, endParam = evaluator.getParameterExtents()
+            midParam = 0.5 * (startParam + endParam)
+            ok, point = evaluator.getPointAtParameter(midParam)
+            ok, derivative = evaluator.getFirstDerivative(midParam)
+            normalA, planarA = FaceNormal(faceA, point, planeNormals)
+            normalB, planarB = FaceNormal(faceB, point, planeNormals)
+
+            sign = -1.0 if coEdgeA.isOpposedToEdge else 1.0
+            self.edges.append(edge)
+            self.lengths.append(edge.length)
+            self.linear.append(edge.geometry.curveType == adsk.core.Curve3DTypes.Line3DCurveType)
+            self.planar.append(planarA and planarB)
+            self.midpoints.append((point.x, point.y, point.z))
+            self.tangents.append((sign*derivative.x, sign*derivative.y, sign*derivative.z))
+            self.normalsA.append(normalA)
+            self.normalsB.append(normalB)
+
+# Outward normal of a face at a point, reading planar faces only once
+def FaceNormal(face: adsk.fusion.BRepFace, point: adsk.core.Point3D, planeNormals: dict):
+    faceKey = face.tempId
+    if faceKey in planeNormals:
+        return planeNormals[faceKey], True
+    if face.geometry.surfaceType == adsk.core.SurfaceTypes.PlaneSurfaceType:
+        ok, normal = face.evaluator.getNormalAtPoint(point)
+        planeNormals[faceKey] = (normal.x, normal.y, normal.z)
+        return planeNormals[faceKey], True
+    ok, normal = face.evaluator.getNormalAtPoint(point)
+    return (normal.x, normal.y, normal.z), False
+
+# Interior angle between the faces of an edge and whether the edge is convex
+def EdgeDihedral(tangent, normalA, normalB):
+    turn = math.acos(max(-1.0, min(1.0, Dot(normalA, normalB))))
+    convex = Dot(Cross(normalA, normalB), tangent) > 1e-9
+    return (math.pi - turn if convex else math.pi + turn), convex
+
+# Rule for picking the edges to chamfer automatically. Lengths are in cm and angles are the interior angle between the faces in radians.
+class EdgeRule:
+    def __init__(self, minLength: float = 0.0, maxLength: float = None, convexOnly: bool = True, linearOnly: bool = False,
+                 minAngle: float = None, maxAngle: float = None, planarOnly: bool = False, outsideBox = None):
+        self.minLength = minLength
+        self.maxLength = maxLength
+        self.convexOnly = convexOnly
+        self.linearOnly = linearOnly
+        self.minAngle = minAngle
+        self.maxAngle = maxAngle
+        self.planarOnly = planarOnly
+        self.outsideBox = outsideBox
+
+    @staticmethod
+    def fromDict(values: dict):
+        return EdgeRule(values.get('minLength', 0.0), values.get('maxLength'), values.get('convexOnly', True), values.get('linearOnly', False),
+                        values.get('minAngle'), values.get('maxAngle'), values.get('planarOnly', False), values.get('outsideBox'))
+
+    def asDict(self):
+        return {
+            'minLength': self.minLength,
+            'maxLength': self.maxLength,
+            'convexOnly': self.convexOnly,
+            'linearOnly': self.linearOnly,
+            'minAngle': self.minAngle,
+            'maxAngle': self.maxAngle,
+            'planarOnly': self.planarOnly,
+            'outsideBox': self.outsideBox
+        }
+
+# Indices of the edges in a table that match a rule
+def ClassifyEdges(table: EdgeTable, rule: EdgeRule):
+    maxLength = rule.maxLength if rule.maxLength is not None else math.inf
+    minAngle = rule.minAngle if rule.minAngle is not None else 0.0
+    maxAngle = rule.maxAngle if rule.maxAngle is not None else 2.0 * math.pi
+    box = rule.outsideBox
+
+    matches = []
+    for i, length in enumerate(table.lengths):
+        if length < rule.minLength or length > maxLength:
+            continue
+        if (rule.linearOnly and not table.linear[i]) or (rule.planarOnly and not table.planar[i]):
+            continue
+        angle, convex = EdgeDihedral(table.tangents[i], table.normalsA[i], table.normalsB[i])
+        if (rule.convexOnly and not convex) or angle < minAngle or angle > maxAngle:
+            continue
+        if box:
+            point = table.midpoints[i]
+            if all(box[0][axis] <= point[axis] <= box[1][axis] for axis in range(3)):
+                continue
+        matches.append(i)
+    return matches
+
+# Pick the edges of a body that match a rule
+def SelectEdges(body: adsk.fusion.BRepBody, rule: EdgeRule):
+    table = EdgeTable(body)
+    return [table.edges[i] for i in ClassifyEdges(table, rule)]
+
+# Fill the edge selection with the edges of the chosen bodies that match the rule in the dialog
+def AutoSelectEdges(inputs: adsk.core.CommandInputs):
+    bodySel: adsk.core.SelectionCommandInput = inputs.itemById('bodies')
+    edgeSel: adsk.core.SelectionCommandInput = inputs.itemById('edges')
+    rule = EdgeRule(minLength=inputs.itemById('minLength').value,
+                    maxLength=inputs.itemById('maxLength').value,
+                    minAngle=inputs.itemById('minAngle').value,
+                    maxAngle=inputs.itemById('maxAngle').value,
+                    planarOnly=inputs.itemById('planarOnly').value)
+
+    edgeSel.clearSelection()
+    _selectionSet.edges.clear()
+    for i in range(0, bodySel.selectionCount):
+        body: adsk.fusion.BRepBody = bodySel.selection(i).entity
+        for edge in SelectEdges(body, rule):
+            edgeSel.addSelection(edge)
+            _selectionSet.add(edge)
+
+# Clean chamfer every body of every design in a list of data file ids and write a JSON report
+def RunBatch(fileIds, rule: EdgeRule, widVal: float, angVal: float, typeVal: str, chain: bool, reportPath: str, save: bool = True):
+    report = {
+        'started': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'rule': rule.asDict(),
+        'width': widVal,
+        'angle': angVal,
+        'style': typeVal,
+        'chain': chain,
+        'report': reportPath,
+        'documents': []
+    }
+    for fileId in fileIds:
+        docReport = {'id': fileId, 'name': None, 'bodies': [], 'seconds': 0.0, 'error': None}
+        startTime = time.perf_counter()
+        doc = None
+        try:
+            dataFile = _app.data.findFileById(fileId)
+            doc: adsk.core.Document = _app.documents.open(dataFile, True)
+            docReport['name'] = doc.name
+            design = adsk.fusion.Design.cast(doc.products.itemByProductType('DesignProductType'))
+
+            # Pick the edges of every body before any of them are changed
+            bodyEdges = []
+            for component in design.allComponents:
+                for body in component.bRepBodies:
+                    if body.isSolid:
+                        bodyEdges.append(SelectEdges(body, rule))
+
+            for edges in bodyEdges:
+                if not edges:
+                    continue
+                for result in CleanChamferEdges(edges, widVal, angVal, typeVal, chain):
+                    result['features'] = [feature.name for feature in result['features']]
+                    docReport['bodies'].append(result)
+
+            if save:
+                doc.save('Clean chamfer batch')
+        except:
+            docReport['error'] = traceback.format_exc()
+        finally:
+            # Close the document even when the chamfer or the save failed, so a long batch doesn't pile up open documents
+            if doc:
+                doc.close(False)
+        docReport['seconds'] = time.perf_counter() - startTime
+        report['documents'].append(docReport)
+
+    with open(reportPath, 'w') as reportFile:
+        json.dump(report, reportFile, indent=4)
+    return report
+
+# Run a batch described by a JSON file, writing the report next to it unless a path is given
+def RunBatchFile(configPath: str):
+    with open(configPath) as configFile:
+        config = json.load(configFile)
+    reportPath = config.get('report', os.path.splitext(configPath)[0] + '-report.json')
+    return RunBatch(config['documents'], EdgeRule.fromDict(config.get('rule', {})),
+                    config['width'], config.get('angle', 0.25*math.pi), config.get('style', 'Equal Distance'),
+                    config.get('chain', True), reportPath, config.get('save', True))
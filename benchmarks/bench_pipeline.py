@@ -0,0 +1,192 @@
+# Time each phase of the chamfer pipeline on synthetic bodies of 10 to 100k edges, counting the API calls and
+# recomputes each phase makes against the fake adsk modules in tests/.
+# Run from the add-in folder: python benchmarks/bench_pipeline.py [--max-edges 100000] [--sides 8]
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'tests'))
+import fakeadsk
+fakeadsk.install()
+import fakecore, synthetic
+
+_sizes = [10, 100, 1000, 10000, 100000]
+_chamferCount = 10
+
+# Stands in for the add-in's profiler, totalling time, API calls and recomputes for each phase name
+class BenchPhase:
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.apiCalls = 0
+
+    def __enter__(self):
+        self.startCalls = fakeadsk.apiCalls()
+        self.startComputes = self.profiler.design.computeCount
+        self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        seconds = time.perf_counter() - self.startTime
+        self.profiler.add(self.name, seconds, fakeadsk.apiCalls() - self.startCalls, self.profiler.design.computeCount - self.startComputes)
+        return False
+
+    def size(self, key: str, value: int):
+        pass
+
+class BenchProfiler:
+    def __init__(self, design):
+        self.enabled = True
+        self.design = design
+        self.phases = {}
+
+    def phase(self, name: str):
+        return BenchPhase(self, name)
+
+    def add(self, name: str, seconds: float, apiCalls: int, computes: int):
+        total = self.phases.setdefault(name, {'count': 0, 'seconds': 0.0, 'apiCalls': 0, 'computes': 0})
+        total['count'] += 1
+        total['seconds'] += seconds
+        total['apiCalls'] += apiCalls
+        total['computes'] += computes
+
+# Run a function on its own, returning its result with the time and API calls it took
+def Measure(func):
+    fakeadsk.resetApiCalls()
+    startTime = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - startTime, fakeadsk.apiCalls()
+
+class Snapshot:
+    def __init__(self, edgeVerts):
+        self.edgeVerts = edgeVerts
+
+# Boundary edges for loops of loopSize edges, alternating closed loops and open chains
+def LoopEdges(edgeCount: int, loopSize: int = 50):
+    edgeVerts = []
+    vertexId = 0
+    loopIndex = 0
+    while len(edgeVerts) < edgeCount:
+        size = min(loopSize, edgeCount - len(edgeVerts))
+        closed = loopIndex % 2 == 0 and size > 1
+        first = vertexId
+        for i in range(size):
+            endId = first if closed and i == size - 1 else vertexId + 1
+            edgeVerts.append((vertexId, endId))
+            vertexId += 1
+        vertexId += 0 if closed else 1
+        loopIndex += 1
+    return Snapshot(edgeVerts)
+
+def BenchLoops(cleanChamfer, edgeCount: int):
+    snapshot = LoopEdges(edgeCount)
+    edgeIds = list(range(edgeCount))
+    edgeIds.reverse()
+    loops, seconds, apiCalls = Measure(lambda: cleanChamfer.BuildBoundaryLoops(snapshot, edgeIds))
+    return [('loops.build', seconds, apiCalls, 0, '{} loops'.format(len(loops)))]
+
+def BenchClassify(cleanChamfer, edgeCount: int, sides: int):
+    design = synthetic.NewDesign()
+    body, rims = synthetic.PlateBody(design.rootComponent, edgeCount, sides)
+    table, tableSeconds, tableCalls = Measure(lambda: cleanChamfer.EdgeTable(body))
+    rule = cleanChamfer.EdgeRule(maxLength=1.5, linearOnly=True)
+    matches, seconds, apiCalls = Measure(lambda: cleanChamfer.ClassifyEdges(table, rule))
+    return [('select.edgeTable', tableSeconds, tableCalls, 0, '{} edges'.format(len(table.edges))),
+            ('select.classify', seconds, apiCalls, 0, '{} matches'.format(len(matches)))]
+
+def BenchSelection(cleanChamfer, edgeCount: int, sides: int):
+    design = synthetic.NewDesign()
+    body, rims = synthetic.PlateBody(design.rootComponent, edgeCount, sides, smoothRims=True)
+    edges = [edge for rim in rims for edge in rim]
+    bodyIndex = cleanChamfer.BodyIndex()
+    chainCache = cleanChamfer.ChainCache(bodyIndex)
+    selectionSet = cleanChamfer.SelectionSet(bodyIndex)
+
+    # Pick every rim edge the way the pre-select and select handlers do, then drop them again
+    def Select():
+        for edge in edges:
+            for chainEdge in chainCache.chain(edge):
+                selectionSet.add(chainEdge)
+    def Unselect():
+        for edge in edges:
+            for chainEdge in chainCache.chain(edge):
+                selectionSet.discard(chainEdge)
+    result, selectSeconds, selectCalls = Measure(Select)
+    result, unselectSeconds, unselectCalls = Measure(Unselect)
+    return [('select.chain', selectSeconds, selectCalls, 0, '{} edges'.format(len(edges))),
+            ('select.unchain', unselectSeconds, unselectCalls, 0, '{} left'.format(len(selectionSet)))]
+
+# Clean chamfer the top rim of every lump of a plate, timing each phase through the add-in's own profiler hooks.
+# Closed rims are lofted, so singleEdges chamfers one straight edge of each rim instead to time the patch regions.
+def BenchPipeline(cleanChamfer, edgeCount: int, sides: int, localStitch: bool = True, singleEdges: bool = False):
+    design = synthetic.NewDesign()
+    app = fakecore.Application.get()
+    app.activeProduct = design
+    body, rims = synthetic.PlateBody(design.rootComponent, edgeCount, sides)
+    edges = [rim[0] for rim in rims] if singleEdges else [edge for rim in rims for edge in rim]
+
+    profiler = BenchProfiler(design)
+    savedProfiler = cleanChamfer._profiler
+    cleanChamfer._profiler = profiler
+    try:
+        results, seconds, apiCalls = Measure(lambda: cleanChamfer.CleanChamferEdges(edges, 0.1, 0.0, 'Equal Distance', False, localStitch))
+    finally:
+        cleanChamfer._profiler = savedProfiler
+    if not all(result['success'] for result in results):
+        raise RuntimeError('Chamfer failed: {}'.format([result['error'] for result in results]))
+
+    prefix = 'pipeline.' + ('edges.' if singleEdges else '') + ('' if localStitch else 'stitch.')
+    rows = [(prefix + 'total', seconds, apiCalls, design.computeCount, '{} edges'.format(len(edges)))]
+    for name, total in profiler.phases.items():
+        rows.append((prefix + name, total['seconds'], total['apiCalls'], total['computes'], '{} runs'.format(total['count'])))
+    return rows
+
+# Build chamferCount clean chamfers, one per plate, as parametric features or as base features, then time a full recompute.
+# The computes column is the fake's compute count, for building and for the recompute.
+def BenchRecompute(cleanChamfer, edgeCount: int, sides: int, chamferCount: int = _chamferCount, baseFeature: bool = False):
+    design = synthetic.NewDesign()
+    app = fakecore.Application.get()
+    app.activeProduct = design
+    plates = [synthetic.PlateBody(design.rootComponent, max(1, edgeCount // chamferCount), sides, name='Plate{}'.format(i + 1))
+              for i in range(chamferCount)]
+
+    def Build():
+        return [result for body, rims in plates
+                for result in cleanChamfer.CleanChamferEdges([edge for rim in rims for edge in rim], 0.1, 0.0, 'Equal Distance', False, True, baseFeature)]
+    results, buildSeconds, buildCalls = Measure(Build)
+    if not all(result['success'] for result in results):
+        raise RuntimeError('Chamfer failed: {}'.format([result['error'] for result in results]))
+    buildComputes = design.computeCount
+    result, seconds, apiCalls = Measure(design.computeAll)
+
+    prefix = 'recompute.baseFeature.' if baseFeature else 'recompute.parametric.'
+    return [(prefix + 'build', buildSeconds, buildCalls, buildComputes, '{} chamfers'.format(len(results))),
+            (prefix + 'computeAll', seconds, apiCalls, design.computeCount - buildComputes, '{} timeline objects'.format(design.timeline.count))]
+
+def Run(maxEdges: int = 100000, sides: int = 8, out=sys.stdout, chamferCount: int = _chamferCount):
+    cleanChamfer = fakeadsk.loadAddIn()
+    app = fakecore.Application.get()
+    cleanChamfer._app = app
+    cleanChamfer._ui = app.userInterface
+
+    rows = []
+    out.write('{:>8}  {:<32}{:>10}{:>12}{:>10}  {}\n'.format('edges', 'phase', 'seconds', 'api calls', 'computes', 'size'))
+    for edgeCount in [size for size in _sizes if size <= maxEdges]:
+        sizeRows = (BenchLoops(cleanChamfer, edgeCount) +
+                    BenchClassify(cleanChamfer, edgeCount, sides) +
+                    BenchSelection(cleanChamfer, edgeCount, sides) +
+                    BenchPipeline(cleanChamfer, edgeCount, sides) +
+                    BenchPipeline(cleanChamfer, edgeCount, sides, False) +
+                    BenchPipeline(cleanChamfer, edgeCount, sides, singleEdges=True) +
+                    BenchRecompute(cleanChamfer, edgeCount, sides, chamferCount) +
+                    BenchRecompute(cleanChamfer, edgeCount, sides, chamferCount, True))
+        for name, seconds, apiCalls, computes, size in sizeRows:
+            out.write('{:>8}  {:<32}{:>10.4f}{:>12}{:>10}  {}\n'.format(edgeCount, name, seconds, apiCalls, computes, size))
+            rows.append((edgeCount, name, seconds, apiCalls, computes, size))
+    return rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the clean chamfer pipeline on synthetic bodies.')
+    parser.add_argument('--max-edges', type=int, default=100000, help='largest body to run, in edges')
+    parser.add_argument('--sides', type=int, default=8, help='sides of each synthetic prism lump')
+    parser.add_argument('--chamfers', type=int, default=_chamferCount, help='clean chamfers to build for the recompute runs')
+    args = parser.parse_args()
+    Run(args.max_edges, args.sides, chamferCount=args.chamfers)
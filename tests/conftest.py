@@ -0,0 +1,31 @@
+import os, sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+import fakeadsk
+
+fakeadsk.install()
+import fakecore
+
+@pytest.fixture(scope='session')
+def cleanChamfer():
+    return fakeadsk.loadAddIn()
+
+# The add-in started in a fresh application, as Fusion does when it loads it, and stopped again afterwards
+@pytest.fixture
+def addIn(cleanChamfer):
+    fakecore.Application.reset()
+    cleanChamfer.run(None)
+    yield cleanChamfer
+    cleanChamfer.stop(None)
+
+# Open the create command on a design and pick edges one at a time, without chaining
+def OpenWithEdges(design, edges):
+    app = fakecore.Application.get()
+    app.activeProduct = design
+    command = app.userInterface.commandDefinitions.itemById('irCleanChamferCreate').execute()
+    inputs = command.commandInputs
+    inputs.itemById('chain').value = False
+    for edge in edges:
+        command.select.fire(fakecore.SelectionEventArgs(fakecore.Selection(edge), inputs.itemById('edges')))
+    return command
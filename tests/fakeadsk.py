@@ -0,0 +1,82 @@
+# In-memory stand-in for the adsk modules so the add-in can be loaded, tested and benchmarked outside Fusion 360.
+# fakecore and fakefusion implement the parts of adsk.core and adsk.fusion the add-in uses. Any other name read
+# from them is a placeholder class, and any constant read from a placeholder is a distinct value.
+import importlib.util, os, sys, types
+
+addInPath = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'Clean Chamfer.py')
+
+# Number of public attribute reads on fake API objects, each of which is a call across the API boundary in Fusion
+class ApiCounter:
+    calls = 0
+
+def resetApiCalls():
+    ApiCounter.calls = 0
+
+def apiCalls():
+    return ApiCounter.calls
+
+class ApiObject:
+    _deleted = False
+
+    def __getattribute__(self, name):
+        if name[0] != '_':
+            ApiCounter.calls += 1
+        return object.__getattribute__(self, name)
+
+    # Read an attribute without counting it, for fake methods that stand for a single call in Fusion
+    def _read(self, name: str):
+        return object.__getattribute__(self, name)
+
+    @classmethod
+    def cast(cls, obj):
+        return obj if isinstance(obj, cls) else None
+
+    @property
+    def isValid(self):
+        return not self._deleted
+
+class PlaceholderType(type):
+    def __getattr__(cls, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return '{}.{}'.format(cls.__name__, name)
+
+# Module level __getattr__ that hands out a placeholder class for every name the module does not define
+def PlaceholderGetter():
+    placeholders = {}
+
+    def getAttribute(attr: str):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        if attr not in placeholders:
+            placeholders[attr] = PlaceholderType(attr, (ApiObject,), {'__init__': lambda self, *args, **kwargs: None})
+        return placeholders[attr]
+    return getAttribute
+
+def PlaceholderModule(name: str):
+    module = types.ModuleType(name)
+    module.__getattr__ = PlaceholderGetter()
+    return module
+
+# Put the fake modules in place of adsk, adsk.core, adsk.fusion and adsk.cam and start a fresh application
+def install():
+    sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+    import fakecore, fakefusion
+
+    adsk = types.ModuleType('adsk')
+    adsk.core = fakecore
+    adsk.fusion = fakefusion
+    adsk.cam = PlaceholderModule('adsk.cam')
+    sys.modules['adsk'] = adsk
+    sys.modules['adsk.core'] = fakecore
+    sys.modules['adsk.fusion'] = fakefusion
+    sys.modules['adsk.cam'] = adsk.cam
+    fakecore.Application.reset()
+    return adsk
+
+# Load Clean Chamfer.py as a module, the way Fusion does when the add-in starts
+def loadAddIn():
+    spec = importlib.util.spec_from_file_location('CleanChamfer', addInPath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,822 @@
+# Fake of the parts of adsk.core used by the add-in
+import math, re
+from fakeadsk import ApiObject, PlaceholderGetter
+
+__getattr__ = PlaceholderGetter()
+
+
+class SurfaceTypes:
+    PlaneSurfaceType = 0
+    CylinderSurfaceType = 1
+    ConeSurfaceType = 2
+    SphereSurfaceType = 3
+    TorusSurfaceType = 4
+    EllipticalCylinderSurfaceType = 5
+    EllipticalConeSurfaceType = 6
+    NurbsSurfaceType = 7
+
+class Curve3DTypes:
+    Line3DCurveType = 0
+    Arc3DCurveType = 1
+    Circle3DCurveType = 2
+    Ellipse3DCurveType = 3
+    EllipticalArc3DCurveType = 4
+    InfiniteLine3DCurveType = 5
+    NurbsCurve3DCurveType = 6
+
+class DropDownStyles:
+    LabeledIconDropDownStyle = 0
+    CheckBoxDropDownStyle = 1
+    TextListDropDownStyle = 2
+
+class DialogResults:
+    DialogOK = 0
+    DialogCancel = 1
+    DialogYes = 2
+    DialogNo = 3
+    DialogError = -1
+
+
+class ObjectCollection(ApiObject):
+    def __init__(self, items=None):
+        self._items = list(items or [])
+
+    @staticmethod
+    def create():
+        return ObjectCollection()
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index: int):
+        return self._items[index] if 0 <= index < len(self._items) else None
+
+    def add(self, item):
+        self._items.append(item)
+        return True
+
+    def contains(self, item):
+        return any(existing is item for existing in self._items)
+
+    def find(self, item, startIndex: int = 0):
+        for index in range(startIndex, len(self._items)):
+            if self._items[index] is item:
+                return index
+        return -1
+
+    def removeByItem(self, item):
+        index = self.find(item)
+        if index < 0:
+            return False
+        del self._items[index]
+        return True
+
+    def removeByIndex(self, index: int):
+        del self._items[index]
+        return True
+
+    def clear(self):
+        self._items = []
+        return True
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Point3D(ApiObject):
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        return Point3D(x, y, z)
+
+    def asArray(self):
+        return [self._read('x'), self._read('y'), self._read('z')]
+
+    def copy(self):
+        return Point3D(self.x, self.y, self.z)
+
+    def distanceTo(self, point):
+        return math.sqrt((self.x - point.x)**2 + (self.y - point.y)**2 + (self.z - point.z)**2)
+
+class Vector3D(ApiObject):
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        return Vector3D(x, y, z)
+
+    def asArray(self):
+        return [self._read('x'), self._read('y'), self._read('z')]
+
+    @property
+    def length(self):
+        return math.sqrt(self.x*self.x + self.y*self.y + self.z*self.z)
+
+    def normalize(self):
+        length = self.length
+        if length == 0:
+            return False
+        self.x, self.y, self.z = self.x/length, self.y/length, self.z/length
+        return True
+
+    def crossProduct(self, vector):
+        return Vector3D(self.y*vector.z - self.z*vector.y, self.z*vector.x - self.x*vector.z, self.x*vector.y - self.y*vector.x)
+
+    def dotProduct(self, vector):
+        return self.x*vector.x + self.y*vector.y + self.z*vector.z
+
+class Line3D(ApiObject):
+    def __init__(self, start, end):
+        self.curveType = Curve3DTypes.Line3DCurveType
+        self._start = start
+        self._end = end
+
+    @property
+    def startPoint(self):
+        return Point3D(*self._start)
+
+    @property
+    def endPoint(self):
+        return Point3D(*self._end)
+
+class Surface(ApiObject):
+    def __init__(self, surfaceType: int):
+        self.surfaceType = surfaceType
+
+class Plane(Surface):
+    def __init__(self, origin, normal):
+        super().__init__(SurfaceTypes.PlaneSurfaceType)
+        self._origin = origin
+        self._normal = normal
+
+    @property
+    def origin(self):
+        return Point3D(*self._origin)
+
+    @property
+    def normal(self):
+        return Vector3D(*self._normal)
+
+class Color(ApiObject):
+    def __init__(self, red: int, green: int, blue: int, opacity: int):
+        self.red = red
+        self.green = green
+        self.blue = blue
+        self.opacity = opacity
+
+    @staticmethod
+    def create(red: int, green: int, blue: int, opacity: int):
+        return Color(red, green, blue, opacity)
+
+
+# Internal units are cm and radians, as in Fusion
+_unitScales = {'': 1.0, 'cm': 1.0, 'mm': 0.1, 'm': 100.0, 'in': 2.54, 'ft': 30.48, 'deg': math.pi/180.0, 'rad': 1.0}
+
+class ValueInput(ApiObject):
+    def __init__(self, realValue: float = None, stringValue: str = ''):
+        self.realValue = realValue
+        self.stringValue = stringValue
+
+    @staticmethod
+    def createByReal(value: float):
+        return ValueInput(value, '')
+
+    @staticmethod
+    def createByString(text: str):
+        match = re.match(r'\s*([-+0-9.eE]+)\s*([A-Za-z]*)\s*$', text)
+        return ValueInput(float(match.group(1)) * _unitScales[match.group(2).lower()], text)
+
+
+# Events hold their handlers the way Fusion does, and count every handler still connected across all events
+class Event(ApiObject):
+    liveHandlers = 0
+
+    def __init__(self, name: str = '', sender=None):
+        self.name = name
+        self.sender = sender
+        self._handlers = []
+
+    def add(self, handler):
+        self._handlers.append(handler)
+        Event.liveHandlers += 1
+        return True
+
+    def remove(self, handler):
+        if handler not in self._handlers:
+            return False
+        self._handlers.remove(handler)
+        Event.liveHandlers -= 1
+        return True
+
+    # Fake only: call the handlers like Fusion does when the event fires
+    def fire(self, args):
+        args.firingEvent = self
+        for handler in list(self._handlers):
+            handler.notify(args)
+        return args
+
+    def _disconnectAll(self):
+        Event.liveHandlers -= len(self._handlers)
+        self._handlers = []
+
+class EventArgs(ApiObject):
+    def __init__(self):
+        self.firingEvent = None
+
+class CommandCreatedEventArgs(EventArgs):
+    def __init__(self, command):
+        super().__init__()
+        self.command = command
+
+class CommandEventArgs(EventArgs):
+    def __init__(self, command):
+        super().__init__()
+        self.command = command
+        self.isValidResult = False
+        self.executeFailed = False
+        self.executeFailedMessage = ''
+
+class InputChangedEventArgs(EventArgs):
+    def __init__(self, input, inputs):
+        super().__init__()
+        self.input = input
+        self.inputs = inputs
+
+class SelectionEventArgs(EventArgs):
+    def __init__(self, selection, activeInput=None):
+        super().__init__()
+        self.selection = selection
+        self.activeInput = activeInput
+        self.isSelectable = True
+        self.additionalEntities = None
+
+class CustomEventArgs(EventArgs):
+    def __init__(self, additionalInfo: str = ''):
+        super().__init__()
+        self.additionalInfo = additionalInfo
+
+class EventHandler:
+    def __init__(self):
+        pass
+
+class CommandCreatedEventHandler(EventHandler):
+    pass
+
+class CommandEventHandler(EventHandler):
+    pass
+
+class InputChangedEventHandler(EventHandler):
+    pass
+
+class SelectionEventHandler(EventHandler):
+    pass
+
+class CustomEventHandler(EventHandler):
+    pass
+
+class ValidateInputsEventHandler(EventHandler):
+    pass
+
+
+class Selection(ApiObject):
+    def __init__(self, entity, point=None):
+        self.entity = entity
+        self.point = point
+
+class CommandInput(ApiObject):
+    def __init__(self, inputs, id: str, name: str):
+        self.id = id
+        self.name = name
+        self.isVisible = True
+        self.isEnabled = True
+        self.isFullWidth = False
+        self.tooltip = ''
+        self._inputs = inputs
+
+    @property
+    def parentCommand(self):
+        return self._inputs._command
+
+    @property
+    def commandInputs(self):
+        return self._inputs
+
+    def deleteMe(self):
+        self._inputs._remove(self)
+        self._deleted = True
+        return True
+
+class SelectionCommandInput(CommandInput):
+    def __init__(self, inputs, id: str, name: str, commandPrompt: str):
+        super().__init__(inputs, id, name)
+        self.commandPrompt = commandPrompt
+        self.filters = []
+        self.limits = (1, 0)
+        self._selections = []
+
+    def addSelectionFilter(self, filter: str):
+        self.filters.append(filter)
+        return True
+
+    def setSelectionLimits(self, minimum: int, maximum: int = 0):
+        self.limits = (minimum, maximum)
+        return True
+
+    @property
+    def selectionCount(self):
+        return len(self._selections)
+
+    def selection(self, index: int):
+        return self._selections[index]
+
+    def addSelection(self, entity):
+        if any(selection.entity is entity for selection in self._selections):
+            return False
+        self._selections.append(Selection(entity))
+        return True
+
+    def clearSelection(self):
+        self._selections = []
+        return True
+
+class BoolValueCommandInput(CommandInput):
+    def __init__(self, inputs, id: str, name: str, isCheckBox: bool, resourceFolder: str, initialValue: bool):
+        super().__init__(inputs, id, name)
+        self.isCheckBox = isCheckBox
+        self.value = initialValue
+
+class ListItem(ApiObject):
+    def __init__(self, items, name: str, index: int, isSelected: bool):
+        self.name = name
+        self.index = index
+        self._items = items
+        self._isSelected = isSelected
+
+    @property
+    def isSelected(self):
+        return self._isSelected
+
+    @isSelected.setter
+    def isSelected(self, value: bool):
+        if value:
+            for item in self._items._items:
+                item._isSelected = False
+        self._isSelected = value
+
+class ListItems(ApiObject):
+    def __init__(self):
+        self._items = []
+
+    def add(self, name: str, isSelected: bool, icon: str = '', beforeIndex: int = -1):
+        item = ListItem(self, name, len(self._items), False)
+        self._items.append(item)
+        if isSelected:
+            item.isSelected = True
+        return item
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index: int):
+        return self._items[index]
+
+class DropDownCommandInput(CommandInput):
+    def __init__(self, inputs, id: str, name: str, dropDownStyle: int):
+        super().__init__(inputs, id, name)
+        self.dropDownStyle = dropDownStyle
+        self.listItems = ListItems()
+
+    @property
+    def selectedItem(self):
+        for item in self.listItems._items:
+            if item._isSelected:
+                return item
+        return None
+
+class ValueCommandInput(CommandInput):
+    def __init__(self, inputs, id: str, name: str, unitType: str, initialValue: ValueInput):
+        super().__init__(inputs, id, name)
+        self.unitType = unitType
+        self.value = initialValue.realValue
+        self.expression = initialValue.stringValue
+
+class AngleValueCommandInput(CommandInput):
+    def __init__(self, inputs, id: str, name: str, initialValue: ValueInput):
+        super().__init__(inputs, id, name)
+        self.value = initialValue.realValue
+        self.expression = initialValue.stringValue
+        self.minimumValue = None
+        self.maximumValue = None
+        self.isMinimumValueInclusive = True
+        self.isMaximumValueInclusive = True
+
+    def setManipulator(self, origin, xDirection, yDirection):
+        return True
+
+class TextBoxCommandInput(CommandInput):
+    def __init__(self, inputs, id: str, name: str, formattedText: str, numRows: int, isReadOnly: bool):
+        super().__init__(inputs, id, name)
+        self.formattedText = formattedText
+        self.numRows = numRows
+        self.isReadOnly = isReadOnly
+
+    @property
+    def text(self):
+        return re.sub('<[^>]*>', '', self.formattedText)
+
+class GroupCommandInput(CommandInput):
+    def __init__(self, inputs, id: str, name: str):
+        super().__init__(inputs, id, name)
+        self.isExpanded = True
+        self.children = CommandInputs(inputs._command, inputs._root)
+
+# Inputs of a command or a group. itemById finds inputs inside groups too, as in Fusion.
+class CommandInputs(ApiObject):
+    def __init__(self, command, root=None):
+        self._command = command
+        self._root = root or self
+        self._inputs = []
+        self._byId = {}
+
+    @property
+    def command(self):
+        return self._command
+
+    @property
+    def count(self):
+        return len(self._inputs)
+
+    def item(self, index: int):
+        return self._inputs[index]
+
+    def itemById(self, id: str):
+        return self._root._byId.get(id)
+
+    def __iter__(self):
+        return iter(list(self._inputs))
+
+    def _add(self, input):
+        self._inputs.append(input)
+        self._root._byId[input.id] = input
+        return input
+
+    def _remove(self, input):
+        self._inputs.remove(input)
+        self._root._byId.pop(input.id, None)
+        if isinstance(input, GroupCommandInput):
+            for child in list(input.children._inputs):
+                input.children._remove(child)
+
+    def addSelectionInput(self, id: str, name: str, commandPrompt: str):
+        return self._add(SelectionCommandInput(self, id, name, commandPrompt))
+
+    def addBoolValueInput(self, id: str, name: str, isCheckBox: bool, resourceFolder: str = '', initialValue: bool = False):
+        return self._add(BoolValueCommandInput(self, id, name, isCheckBox, resourceFolder, initialValue))
+
+    def addDropDownCommandInput(self, id: str, name: str, dropDownStyle: int):
+        return self._add(DropDownCommandInput(self, id, name, dropDownStyle))
+
+    def addValueInput(self, id: str, name: str, unitType: str, initialValue: ValueInput):
+        return self._add(ValueCommandInput(self, id, name, unitType, initialValue))
+
+    def addAngleValueCommandInput(self, id: str, name: str, initialValue: ValueInput):
+        return self._add(AngleValueCommandInput(self, id, name, initialValue))
+
+    def addTextBoxCommandInput(self, id: str, name: str, formattedText: str, numRows: int, isReadOnly: bool):
+        return self._add(TextBoxCommandInput(self, id, name, formattedText, numRows, isReadOnly))
+
+    def addGroupCommandInput(self, id: str, name: str):
+        return self._add(GroupCommandInput(self, id, name))
+
+class Command(ApiObject):
+    def __init__(self, definition):
+        self.parentCommandDefinition = definition
+        self.isOKButtonVisible = True
+        self.okButtonText = 'OK'
+        self.commandInputs = CommandInputs(self)
+        self._events = []
+        self._previewMark = None
+        self.preSelect = self._event('preSelect')
+        self.select = self._event('select')
+        self.unselect = self._event('unselect')
+        self.inputChanged = self._event('inputChanged')
+        self.validateInputs = self._event('validateInputs')
+        self.executePreview = self._event('executePreview')
+        self.execute = self._event('execute')
+        self.destroy = self._event('destroy')
+        self.activate = self._event('activate')
+        self.deactivate = self._event('deactivate')
+
+    def _event(self, name: str):
+        event = Event(name, self)
+        self._events.append(event)
+        return event
+
+    def doExecutePreview(self):
+        self._abortPreview()
+        design = Application.get().activeProduct
+        if design is not None:
+            self._previewMark = (design, design.timeline.count)
+        self.executePreview.fire(CommandEventArgs(self))
+        return True
+
+    # Run the command's execute like OK does, then close it
+    def doExecute(self, terminate: bool = True):
+        self._abortPreview()
+        self.execute.fire(CommandEventArgs(self))
+        if terminate:
+            self.cancel()
+        return True
+
+    # Fake only: take back what the last preview pass built, as Fusion does before the next pass or execute
+    def _abortPreview(self):
+        if self._previewMark:
+            design, count = self._previewMark
+            while design.timeline.count > count:
+                design.timeline.item(design.timeline.count - 1).entity.deleteMe()
+            self._previewMark = None
+
+    # Fake only: close the dialog, firing destroy, after which Fusion lets go of the command and its events
+    def cancel(self):
+        self._abortPreview()
+        self.destroy.fire(CommandEventArgs(self))
+        for event in self._events:
+            event._disconnectAll()
+        self._deleted = True
+
+    # Fake only: change an input the way a user does, firing inputChanged
+    def changeInput(self, input):
+        return self.inputChanged.fire(InputChangedEventArgs(input, input.commandInputs))
+
+class CommandDefinition(ApiObject):
+    def __init__(self, definitions, id: str, name: str, tooltip: str, resourceFolder: str):
+        self.id = id
+        self.name = name
+        self.tooltip = tooltip
+        self.resourceFolder = resourceFolder
+        self.commandCreated = Event('commandCreated', self)
+        self._definitions = definitions
+
+    # Open the command, firing commandCreated. Unlike Fusion this returns the command so tests can drive it.
+    def execute(self, input=None):
+        command = Command(self)
+        self.commandCreated.fire(CommandCreatedEventArgs(command))
+        return command
+
+    def deleteMe(self):
+        self._definitions._items.pop(self.id, None)
+        self.commandCreated._disconnectAll()
+        self._deleted = True
+        return True
+
+class CommandDefinitions(ApiObject):
+    def __init__(self):
+        self._items = {}
+
+    def addButtonDefinition(self, id: str, name: str, tooltip: str, resourceFolder: str = ''):
+        if id in self._items:
+            raise RuntimeError('3 : A command definition with the id {} already exists'.format(id))
+        definition = CommandDefinition(self, id, name, tooltip, resourceFolder)
+        self._items[id] = definition
+        return definition
+
+    def itemById(self, id: str):
+        return self._items.get(id)
+
+    @property
+    def count(self):
+        return len(self._items)
+
+class CommandControl(ApiObject):
+    def __init__(self, controls, definition):
+        self.id = definition.id
+        self.commandDefinition = definition
+        self.isPromoted = False
+        self.isPromotedByDefault = False
+        self._controls = controls
+
+    def deleteMe(self):
+        self._controls._items.remove(self)
+        self._deleted = True
+        return True
+
+class ToolbarControls(ApiObject):
+    def __init__(self):
+        self._items = []
+
+    def addCommand(self, commandDefinition, positionID: str = '', isBefore: bool = True):
+        control = CommandControl(self, commandDefinition)
+        self._items.append(control)
+        return control
+
+    def itemById(self, id: str):
+        for control in self._items:
+            if control.id == id:
+                return control
+        return None
+
+    @property
+    def count(self):
+        return len(self._items)
+
+class ToolbarPanel(ApiObject):
+    def __init__(self, id: str):
+        self.id = id
+        self.controls = ToolbarControls()
+
+class ToolbarPanelList(ApiObject):
+    def __init__(self):
+        self._items = {}
+
+    def itemById(self, id: str):
+        return self._items.setdefault(id, ToolbarPanel(id))
+
+class TextCommandPalette(ApiObject):
+    def __init__(self):
+        self.id = 'TextCommands'
+        self.lines = []
+
+    def writeText(self, text: str):
+        self.lines.append(text)
+        return True
+
+class Palettes(ApiObject):
+    def __init__(self):
+        self._items = {'TextCommands': TextCommandPalette()}
+
+    def itemById(self, id: str):
+        return self._items.get(id)
+
+class Selections(ApiObject):
+    def __init__(self):
+        self._items = []
+
+    def add(self, entity):
+        self._items.append(entity)
+        return True
+
+    def removeByEntity(self, entity):
+        if entity in self._items:
+            self._items.remove(entity)
+            return True
+        return False
+
+    def clear(self):
+        self._items = []
+        return True
+
+    @property
+    def count(self):
+        return len(self._items)
+
+class FileDialog(ApiObject):
+    def __init__(self, ui):
+        self.title = ''
+        self.filter = ''
+        self.isMultiSelectEnabled = False
+        self.filename = ''
+        self._ui = ui
+
+    # The fake user picks ui.fileDialogPath, or cancels if there is none
+    def showOpen(self):
+        if not self._ui.fileDialogPath:
+            return DialogResults.DialogCancel
+        self.filename = self._ui.fileDialogPath
+        return DialogResults.DialogOK
+
+class UserInterface(ApiObject):
+    def __init__(self):
+        self.commandDefinitions = CommandDefinitions()
+        self.allToolbarPanels = ToolbarPanelList()
+        self.palettes = Palettes()
+        self.activeSelections = Selections()
+        self.messages = []
+        self.fileDialogPath = None
+
+    def messageBox(self, text: str, title: str = '', buttons: int = 0, icon: int = 0):
+        self.messages.append(text)
+        return DialogResults.DialogOK
+
+    def createFileDialog(self):
+        return FileDialog(self)
+
+    # Fake only: the lines written to the Text Commands palette
+    @property
+    def textLines(self):
+        return self.palettes.itemById('TextCommands').lines
+
+
+class DataFile(ApiObject):
+    def __init__(self, id: str, document):
+        self.id = id
+        self.name = document.name
+        self._document = document
+
+class Data(ApiObject):
+    def __init__(self):
+        self._files = {}
+
+    def findFileById(self, id: str):
+        return self._files.get(id)
+
+    # Fake only: put a document in the cloud under an id
+    def addFile(self, id: str, document):
+        self._files[id] = DataFile(id, document)
+        return self._files[id]
+
+class Products(ApiObject):
+    def __init__(self, products):
+        self._products = products
+
+    def itemByProductType(self, productType: str):
+        return self._products.get(productType)
+
+class Document(ApiObject):
+    def __init__(self, name: str, design):
+        self.name = name
+        self.products = Products({'DesignProductType': design})
+        self.saves = []
+        self.isOpen = False
+        design.parentDocument = self
+
+    def save(self, description: str):
+        self.saves.append(description)
+        return True
+
+    def close(self, saveChanges: bool):
+        self.isOpen = False
+        return True
+
+class Documents(ApiObject):
+    def __init__(self):
+        self._opened = []
+
+    def open(self, dataFile, visible: bool = True):
+        document = dataFile._document
+        document.isOpen = True
+        self._opened.append(document)
+        return document
+
+    @property
+    def count(self):
+        return len(self._opened)
+
+class Application(ApiObject):
+    _current = None
+
+    def __init__(self):
+        self.userInterface = UserInterface()
+        self.activeProduct = None
+        self.data = Data()
+        self.documents = Documents()
+        self._customEvents = {}
+        self._firedEvents = []
+
+    @staticmethod
+    def get():
+        return Application._current
+
+    # Fake only: start over with a new application
+    @staticmethod
+    def reset():
+        Application._current = Application()
+        return Application._current
+
+    def registerCustomEvent(self, eventId: str):
+        if eventId in self._customEvents:
+            raise RuntimeError('3 : The custom event {} is already registered'.format(eventId))
+        self._customEvents[eventId] = Event(eventId, self)
+        return self._customEvents[eventId]
+
+    def unregisterCustomEvent(self, eventId: str):
+        event = self._customEvents.pop(eventId, None)
+        if event is None:
+            return False
+        event._disconnectAll()
+        return True
+
+    # Fusion queues custom events and delivers them on the main thread later
+    def fireCustomEvent(self, eventId: str, additionalInfo: str = ''):
+        self._firedEvents.append((eventId, additionalInfo))
+        return True
+
+    # Fake only: deliver the queued custom events, as the main thread does when it goes idle
+    def processCustomEvents(self):
+        fired, self._firedEvents = self._firedEvents, []
+        for eventId, additionalInfo in fired:
+            event = self._customEvents.get(eventId)
+            if event:
+                event.fire(CustomEventArgs(additionalInfo))
+        return len(fired)
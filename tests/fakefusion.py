@@ -0,0 +1,1033 @@
+# Fake of the parts of adsk.fusion used by the add-in, with enough B-rep topology and feature behaviour to run the
+# whole chamfer pipeline. Every feature add or parameter change counts as one recompute of the design.
+import math
+from fakeadsk import ApiObject, PlaceholderGetter
+from fakecore import ObjectCollection, Point3D, Vector3D, Line3D, Surface, Plane, SurfaceTypes, Curve3DTypes
+
+__getattr__ = PlaceholderGetter()
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+    NewComponentFeatureOperation = 4
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+class FeatureHealthStates:
+    HealthyFeatureHealthState = 0
+    WarningFeatureHealthState = 1
+    ErrorFeatureHealthState = 2
+    SuppressedFeatureHealthState = 3
+    RolledBackFeatureHealthState = 4
+    UnknownFeatureHealthState = 5
+
+
+def Sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+def Add(a, b):
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+def Scale(a, s: float):
+    return (a[0]*s, a[1]*s, a[2]*s)
+
+def Dot(a, b):
+    return a[0]*b[0] + a[1]*b[1] + a[2]*b[2]
+
+def Cross(a, b):
+    return (a[1]*b[2] - a[2]*b[1], a[2]*b[0] - a[0]*b[2], a[0]*b[1] - a[1]*b[0])
+
+def Normalize(a):
+    length = math.sqrt(Dot(a, a))
+    return a if length == 0 else Scale(a, 1.0/length)
+
+
+# Evaluator of a straight edge, parameterized by length from its start
+class CurveEvaluator3D(ApiObject):
+    def __init__(self, start, end):
+        self._start = start
+        self._length = math.sqrt(Dot(Sub(end, start), Sub(end, start)))
+        self._direction = Normalize(Sub(end, start))
+
+    def _point(self, parameter: float):
+        return Point3D(*Add(self._start, Scale(self._direction, parameter)))
+
+    def getParameterExtents(self):
+        return True, 0.0, self._length
+
+    def getPointAtParameter(self, parameter: float):
+        return True, self._point(parameter)
+
+    def getFirstDerivative(self, parameter: float):
+        return True, Vector3D(*self._direction)
+
+    def getFirstDerivatives(self, parameters):
+        return True, [Vector3D(*self._direction) for parameter in parameters]
+
+    # A line strokes to its end points
+    def getStrokes(self, fromParameter: float, toParameter: float, tolerance: float):
+        return True, [self._point(fromParameter), self._point(toParameter)]
+
+    def getParameterAtPoint(self, point):
+        return True, Dot(Sub((point.x, point.y, point.z), self._start), self._direction)
+
+    def getParametersAtPoints(self, points):
+        return True, [Dot(Sub((point.x, point.y, point.z), self._start), self._direction) for point in points]
+
+# Evaluator of a flat convex face. Parameters are model space points so they can be checked against the face outline.
+class SurfaceEvaluator(ApiObject):
+    def __init__(self, face):
+        self._face = face
+
+    def getNormalAtPoint(self, point):
+        return True, Vector3D(*self._face._normal)
+
+    def getNormalsAtPoints(self, points):
+        return True, [Vector3D(*self._face._normal) for point in points]
+
+    def getParameterAtPoint(self, point):
+        return True, (point.x, point.y, point.z)
+
+    def isParameterOnFace(self, parameter):
+        outline = self._face._outline
+        normal = self._face._normal
+        if Dot(Sub(parameter, outline[0]), normal) > 1e-6 or Dot(Sub(parameter, outline[0]), normal) < -1e-6:
+            return False
+        for i, start in enumerate(outline):
+            end = outline[(i + 1) % len(outline)]
+            if Dot(Cross(Sub(end, start), Sub(parameter, start)), normal) < -1e-9:
+                return False
+        return True
+
+
+class BRepVertex(ApiObject):
+    def __init__(self, body, position):
+        self.tempId = body._newTempId('vertex')
+        self.entityToken = '{}/v{}'.format(body._token, self.tempId)
+        self._body = body
+        self._position = position
+        self._edges = []
+
+    @property
+    def body(self):
+        return self._body
+
+    @property
+    def geometry(self):
+        return Point3D(*self._position)
+
+    @property
+    def edges(self):
+        return ObjectCollection(self._edges)
+
+class BRepLoop(ApiObject):
+    def __init__(self, face):
+        self.face = face
+        self.isOuter = True
+        self._coEdges = []
+
+    @property
+    def coEdges(self):
+        return ObjectCollection(self._coEdges)
+
+class BRepCoEdge(ApiObject):
+    def __init__(self, edge, loop, isOpposedToEdge: bool):
+        self.edge = edge
+        self.loop = loop
+        self.isOpposedToEdge = isOpposedToEdge
+
+class BRepEdge(ApiObject):
+    def __init__(self, body, startVertex: BRepVertex, endVertex: BRepVertex):
+        self.tempId = body._newTempId('edge')
+        self.entityToken = '{}/e{}'.format(body._token, self.tempId)
+        self.assemblyContext = None
+        self._body = body
+        self._start = startVertex
+        self._end = endVertex
+        self._faces = []
+        self._coEdges = []
+        self._chain = None
+        startVertex._edges.append(self)
+        if endVertex is not startVertex:
+            endVertex._edges.append(self)
+
+    @property
+    def body(self):
+        return self._body
+
+    @property
+    def nativeObject(self):
+        return self
+
+    @property
+    def startVertex(self):
+        return self._start
+
+    @property
+    def endVertex(self):
+        return self._end
+
+    @property
+    def faces(self):
+        return ObjectCollection(self._faces)
+
+    @property
+    def coEdges(self):
+        return ObjectCollection(self._coEdges)
+
+    @property
+    def length(self):
+        delta = Sub(self._end._position, self._start._position)
+        return math.sqrt(Dot(delta, delta))
+
+    @property
+    def geometry(self):
+        return Line3D(self._start._position, self._end._position)
+
+    @property
+    def evaluator(self):
+        return CurveEvaluator3D(self._start._position, self._end._position)
+
+    # Edges with the same chain are tangent to each other, as around a filleted pocket
+    @property
+    def tangentiallyConnectedEdges(self):
+        return ObjectCollection(self._chain or [self])
+
+class BRepFace(ApiObject):
+    def __init__(self, body, surfaceType: int, normal, outline):
+        self.tempId = body._newTempId('face')
+        self.entityToken = '{}/f{}'.format(body._token, self.tempId)
+        self.assemblyContext = None
+        self._body = body
+        self._surfaceType = surfaceType
+        self._normal = normal
+        self._outline = outline
+        self._edges = []
+        self._loop = BRepLoop(self)
+
+    @property
+    def body(self):
+        return self._body
+
+    @property
+    def nativeObject(self):
+        return self
+
+    @property
+    def edges(self):
+        return ObjectCollection(self._edges)
+
+    @property
+    def loops(self):
+        return ObjectCollection([self._loop])
+
+    @property
+    def geometry(self):
+        if self._surfaceType == SurfaceTypes.PlaneSurfaceType:
+            return Plane(self._outline[0], self._normal)
+        return Surface(self._surfaceType)
+
+    @property
+    def evaluator(self):
+        return SurfaceEvaluator(self)
+
+    # Fake only: make the face one side of an edge, adding the edge to the face's own list unless the face only borders it
+    def _link(self, edge: BRepEdge, isOpposedToEdge: bool, ownsEdge: bool = True):
+        coEdge = BRepCoEdge(edge, self._loop, isOpposedToEdge)
+        self._loop._coEdges.append(coEdge)
+        edge._coEdges.append(coEdge)
+        edge._faces.append(self)
+        if ownsEdge:
+            self._edges.append(edge)
+        return coEdge
+
+# A body whose vertices, edges and faces get ids that are unique within the body only, like tempId in Fusion
+class BRepBody(ApiObject):
+    def __init__(self, component, name: str = 'Body', isSolid: bool = True):
+        self.name = name
+        self.isSolid = isSolid
+        self.assemblyContext = None
+        self._component = component
+        self._tempIds = {}
+        self._vertices = []
+        self._edges = []
+        self._faces = []
+        self._token = component.parentDesign._newToken('body') if component else 'temporary'
+        self._tokenReads = 0
+        if component:
+            component.parentDesign._register(self)
+
+    # Fusion can hand out a different token string for the same body, so each read here returns a new one.
+    # Only findEntityByToken can tell that two of them belong to the same body.
+    @property
+    def entityToken(self):
+        self._tokenReads += 1
+        return '{}#{}'.format(self._token, self._tokenReads)
+
+    @property
+    def parentComponent(self):
+        return self._component
+
+    @property
+    def nativeObject(self):
+        return self
+
+    @property
+    def vertices(self):
+        return ObjectCollection(self._vertices)
+
+    @property
+    def edges(self):
+        return ObjectCollection(self._edges)
+
+    @property
+    def faces(self):
+        return ObjectCollection(self._faces)
+
+    def deleteMe(self):
+        self._deleted = True
+        return True
+
+    def _newTempId(self, kind: str):
+        tempId = self._tempIds.get(kind, 0) + 1
+        self._tempIds[kind] = tempId
+        return tempId
+
+    # Fake only: build the body's topology
+    def _addVertex(self, position):
+        vertex = BRepVertex(self, position)
+        self._vertices.append(vertex)
+        return vertex
+
+    def _addEdge(self, startVertex: BRepVertex, endVertex: BRepVertex):
+        edge = BRepEdge(self, startVertex, endVertex)
+        self._edges.append(edge)
+        return edge
+
+    # The boundary is a list of (edge, isOpposedToEdge) running counterclockwise around the normal
+    def _addFace(self, surfaceType: int, normal, outline, boundary):
+        face = BRepFace(self, surfaceType, normal, outline)
+        for edge, isOpposedToEdge in boundary:
+            face._link(edge, isOpposedToEdge)
+        self._faces.append(face)
+        return face
+
+class BRepBodies(ObjectCollection):
+    def __init__(self, component):
+        super().__init__()
+        self._component = component
+
+    # Add a copy of a temporary body to the component
+    def add(self, body: BRepBody, targetBaseFeature=None):
+        newBody = BRepBody(self._component, body.name, body.isSolid)
+        self._items.append(newBody)
+        return newBody
+
+    def itemByName(self, name: str):
+        for body in self._items:
+            if body.name == name:
+                return body
+        return None
+
+class TemporaryBRepManager(ApiObject):
+    _instance = None
+
+    @staticmethod
+    def get():
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def copy(self, body: BRepBody):
+        return BRepBody(None, body.name, body.isSolid)
+
+
+class UnitsManager(ApiObject):
+    _scales = {'cm': 1.0, 'mm': 10.0, 'm': 0.01, 'in': 1.0/2.54, 'deg': 180.0/math.pi, 'rad': 1.0}
+
+    def __init__(self):
+        self.defaultLengthUnits = 'cm'
+
+    def formatInternalValue(self, internalValue: float, displayUnits: str = '', showUnits: bool = True):
+        units = displayUnits or self.defaultLengthUnits
+        text = '{:g}'.format(internalValue * self._scales.get(units, 1.0))
+        return text + ' ' + units if showUnits else text
+
+class ModelParameter(ApiObject):
+    def __init__(self, design, name: str, value: float):
+        self.name = name
+        self._design = design
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    # Each change to a parameter recomputes the design
+    @value.setter
+    def value(self, value: float):
+        self._value = value
+        self._design._compute()
+
+    @property
+    def expression(self):
+        return '{:g} cm'.format(self._value)
+
+class Attribute(ApiObject):
+    def __init__(self, parent, groupName: str, name: str, value: str):
+        self.parent = parent
+        self.groupName = groupName
+        self.name = name
+        self.value = value
+
+    def deleteMe(self):
+        self._deleted = True
+        return True
+
+class Attributes(ApiObject):
+    def __init__(self, parent, design):
+        self._parent = parent
+        self._design = design
+        self._items = []
+
+    def add(self, groupName: str, name: str, value: str):
+        existing = self.itemByName(groupName, name)
+        if existing:
+            existing.value = value
+            return existing
+        attribute = Attribute(self._parent, groupName, name, value)
+        self._items.append(attribute)
+        self._design._attributes.append(attribute)
+        return attribute
+
+    def itemByName(self, groupName: str, name: str):
+        for attribute in self._items:
+            if attribute.groupName == groupName and attribute.name == name and attribute.isValid:
+                return attribute
+        return None
+
+    @property
+    def count(self):
+        return len(self._items)
+
+
+class TimelineObject(ApiObject):
+    def __init__(self, timeline, entity):
+        self.entity = entity
+        self.isGroup = False
+        self._timeline = timeline
+
+    @property
+    def index(self):
+        return self._timeline._objects.index(self)
+
+    @property
+    def parentGroup(self):
+        for group in self._timeline._groups:
+            if self in group._objects:
+                return group
+        return None
+
+    def rollTo(self, rollBefore: bool):
+        self._timeline.markerPosition = self.index if rollBefore else self.index + 1
+        return True
+
+class TimelineGroup(ApiObject):
+    def __init__(self, timeline, objects):
+        self.isGroup = True
+        self.name = 'Group'
+        self._timeline = timeline
+        self._objects = objects
+
+    @property
+    def count(self):
+        return len(self._objects)
+
+    def item(self, index: int):
+        return self._objects[index]
+
+    def deleteMe(self, deleteGroupAndContents: bool = True):
+        self._timeline._groups.remove(self)
+        if deleteGroupAndContents:
+            for timelineObject in list(self._objects):
+                timelineObject.entity.deleteMe()
+        self._deleted = True
+        return True
+
+class TimelineGroups(ApiObject):
+    def __init__(self, timeline):
+        self._timeline = timeline
+
+    def add(self, startIndex: int, endIndex: int):
+        objects = self._timeline._objects[startIndex:endIndex + 1]
+        if any(timelineObject.parentGroup for timelineObject in objects):
+            raise RuntimeError('3 : The timeline objects are already in a group')
+        group = TimelineGroup(self._timeline, objects)
+        self._timeline._groups.append(group)
+        return group
+
+    @property
+    def count(self):
+        return len(self._timeline._groups)
+
+    def item(self, index: int):
+        return self._timeline._groups[index]
+
+class Timeline(ApiObject):
+    def __init__(self):
+        self.markerPosition = 0
+        self.timelineGroups = TimelineGroups(self)
+        self._objects = []
+        self._groups = []
+
+    @property
+    def count(self):
+        return len(self._objects)
+
+    def item(self, index: int):
+        return self._objects[index]
+
+    def moveToEnd(self):
+        self.markerPosition = len(self._objects)
+        return True
+
+    # New features go in at the marker, as in Fusion
+    def _insert(self, entity):
+        timelineObject = TimelineObject(self, entity)
+        self._objects.insert(self.markerPosition, timelineObject)
+        self.markerPosition += 1
+        return timelineObject
+
+    def _remove(self, timelineObject: TimelineObject):
+        index = self._objects.index(timelineObject)
+        del self._objects[index]
+        if index < self.markerPosition:
+            self.markerPosition -= 1
+        for group in list(self._groups):
+            if timelineObject in group._objects:
+                group._objects.remove(timelineObject)
+                if not group._objects:
+                    self._groups.remove(group)
+
+
+class Feature(ApiObject):
+    def __init__(self, component, bodies=()):
+        design = component.parentDesign
+        typeName = type(self).__name__.replace('Feature', '')
+        count = component._featureCounts.get(typeName, 0) + 1
+        component._featureCounts[typeName] = count
+        self.name = '{}{}'.format(typeName, count)
+        self.healthState = FeatureHealthStates.HealthyFeatureHealthState
+        self.entityToken = design._newToken('feature')
+        self.attributes = Attributes(self, design)
+        self._component = component
+        self._bodies = list(bodies)
+        self._faces = []
+        design._register(self)
+        self.timelineObject = design.timeline._insert(self)
+        design._compute()
+
+    @property
+    def parentComponent(self):
+        return self._component
+
+    @property
+    def bodies(self):
+        return ObjectCollection(self._bodies)
+
+    @property
+    def faces(self):
+        return ObjectCollection(self._faces)
+
+    def deleteMe(self):
+        self._component.parentDesign.timeline._remove(self.timelineObject)
+        for face in self._faces:
+            face._deleted = True
+        self._deleted = True
+        return True
+
+class EqualDistanceChamferEdgeSet(ApiObject):
+    def __init__(self, edges, distance, isTangentChain: bool):
+        self.edges = edges
+        self.distance = distance
+        self.isTangentChain = isTangentChain
+
+class DistanceAndAngleChamferEdgeSet(ApiObject):
+    def __init__(self, edges, distance, angle, isFlipped: bool, isTangentChain: bool):
+        self.edges = edges
+        self.distance = distance
+        self.angle = angle
+        self.isFlipped = isFlipped
+        self.isTangentChain = isTangentChain
+
+class ChamferEdgeSets(ApiObject):
+    def __init__(self):
+        self._items = []
+
+    def addEqualDistanceChamferEdgeSet(self, edges, distance, isTangentChain: bool):
+        edgeSet = EqualDistanceChamferEdgeSet(list(edges), distance, isTangentChain)
+        self._items.append(edgeSet)
+        return edgeSet
+
+    def addDistanceAndAngleChamferEdgeSet(self, edges, distance, angle, isFlipped: bool, isTangentChain: bool):
+        edgeSet = DistanceAndAngleChamferEdgeSet(list(edges), distance, angle, isFlipped, isTangentChain)
+        self._items.append(edgeSet)
+        return edgeSet
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index: int):
+        return self._items[index]
+
+class ChamferFeatureInput(ApiObject):
+    def __init__(self):
+        self.chamferEdgeSets = ChamferEdgeSets()
+
+class ChamferFeature(Feature):
+    def __init__(self, component, bodies, edgeSets, edgeWidths):
+        super().__init__(component, bodies)
+        self._edgeSets = edgeSets
+        self._faces = ChamferFaces(edgeWidths)
+
+    @property
+    def edgeSets(self):
+        return ObjectCollection(self._edgeSets)
+
+class ChamferFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+        self.failingEdges = set()
+
+    def createInput2(self):
+        return ChamferFeatureInput()
+
+    # Chamfer the edges, failing like Fusion does if any edge is in failingEdges
+    def add(self, input: ChamferFeatureInput):
+        design = self._component.parentDesign
+        edgeSets = []
+        edgeWidths = []
+        bodies = []
+        for inputSet in input.chamferEdgeSets._items:
+            edges = []
+            seen = set()
+            for edge in inputSet.edges:
+                for chainEdge in (edge._chain or [edge]) if inputSet.isTangentChain else [edge]:
+                    if id(chainEdge) not in seen:
+                        seen.add(id(chainEdge))
+                        edges.append(chainEdge)
+            widthA = inputSet.distance.realValue
+            if isinstance(inputSet, DistanceAndAngleChamferEdgeSet):
+                widthB = widthA * math.tan(inputSet.angle.realValue)
+                edgeSets.append(DistanceAndAngleChamferEdgeSet(edges, ModelParameter(design, 'd', widthA), ModelParameter(design, 'a', inputSet.angle.realValue), inputSet.isFlipped, inputSet.isTangentChain))
+            else:
+                widthB = widthA
+                edgeSets.append(EqualDistanceChamferEdgeSet(edges, ModelParameter(design, 'd', widthA), inputSet.isTangentChain))
+            for edge in edges:
+                edgeWidths.append((edge, widthA, widthB))
+                if not any(body is edge._body for body in bodies):
+                    bodies.append(edge._body)
+        if not edgeWidths or any(edge.entityToken in self.failingEdges for edge, widthA, widthB in edgeWidths):
+            design._compute()
+            raise RuntimeError('3 : Compute Failed')
+        return ChamferFeature(self._component, bodies, edgeSets, edgeWidths)
+
+# Offset directions of an edge into its two faces, following the edge's direction in its first face
+def EdgeOffsets(edge: BRepEdge):
+    coEdgeA = edge._coEdges[0]
+    faceA = coEdgeA.loop.face
+    faceB = edge._coEdges[1].loop.face
+    tangent = Normalize(Sub(edge._end._position, edge._start._position))
+    if coEdgeA.isOpposedToEdge:
+        tangent = Scale(tangent, -1.0)
+    return faceA, faceB, tangent, Normalize(Cross(faceA._normal, tangent)), Normalize(Cross(tangent, faceB._normal))
+
+# Build the faces a chamfer leaves on its body: one face per edge, bounded by a rail on each neighbouring face and by a
+# shared miter edge where two chamfered edges meet on a common face, or by an end edge otherwise
+def ChamferFaces(edgeWidths):
+    vertexEdges = {}
+    for edge, widthA, widthB in edgeWidths:
+        for vertex in (edge._start, edge._end):
+            vertexEdges.setdefault(id(vertex), []).append(edge)
+
+    corners = {}
+    miters = {}
+    faces = []
+
+    def Corner(body, key, position):
+        if key not in corners:
+            corners[key] = BRepVertex(body, position)
+        return corners[key]
+
+    for edge, widthA, widthB in edgeWidths:
+        body = edge._body
+        faceA, faceB, tangent, dirA, dirB = EdgeOffsets(edge)
+
+        # Corners of the chamfer face on each side at each end of the edge
+        ends = []
+        for vertex in (edge._start, edge._end):
+            partners = [other for other in vertexEdges[id(vertex)] if other is not edge]
+            common = None
+            if len(partners) == 1:
+                shared = [face for face in partners[0]._faces[:2] if face in (faceA, faceB)]
+                common = shared[0] if shared else None
+            position = vertex._position
+            if common:
+                keyA = (id(vertex), 'common' if common is faceA else 'outer')
+                keyB = (id(vertex), 'common' if common is faceB else 'outer')
+            else:
+                keyA = (id(vertex), id(edge), 'A')
+                keyB = (id(vertex), id(edge), 'B')
+            cornerA = Corner(body, keyA, Add(position, Scale(dirA, widthA)))
+            cornerB = Corner(body, keyB, Add(position, Scale(dirB, widthB)))
+            ends.append((vertex, common, cornerA, cornerB))
+
+        (startVertex, startCommon, startA, startB), (endVertex, endCommon, endA, endB) = ends
+        railA = BRepEdge(body, startA, endA)
+        railB = BRepEdge(body, startB, endB)
+
+        # The chamfer face is flat when both neighbouring faces are
+        outline = [startA._position, endA._position, endB._position, startB._position]
+        if faceA._surfaceType == SurfaceTypes.PlaneSurfaceType and faceB._surfaceType == SurfaceTypes.PlaneSurfaceType:
+            normal = Normalize(Cross(Sub(endA._position, startA._position), Sub(startB._position, startA._position)))
+            if Dot(normal, Add(faceA._normal, faceB._normal)) < 0:
+                normal = Scale(normal, -1.0)
+            chamferFace = BRepFace(body, SurfaceTypes.PlaneSurfaceType, normal, outline)
+        else:
+            chamferFace = BRepFace(body, SurfaceTypes.NurbsSurfaceType, Normalize(Add(faceA._normal, faceB._normal)), outline)
+
+        chamferFace._link(railA, False)
+        faceA._link(railA, True, False)
+        for vertex, common, cornerA, cornerB in ends[::-1]:
+            if common:
+                # Both chamfer faces at this corner share the miter edge
+                miter = miters.get(id(vertex))
+                if miter is None:
+                    miter = BRepEdge(body, cornerA if common is faceA else cornerB, cornerB if common is faceA else cornerA)
+                    miters[id(vertex)] = miter
+                chamferFace._link(miter, False)
+            else:
+                endEdge = BRepEdge(body, cornerA, cornerB)
+                chamferFace._link(endEdge, False)
+                endFace = next((face for other in vertex._edges for face in other._faces if face not in (faceA, faceB)), faceA)
+                endFace._link(endEdge, True, False)
+            if vertex is edge._end:
+                chamferFace._link(railB, True)
+                faceB._link(railB, False, False)
+        faces.append(chamferFace)
+    return faces
+
+class Path(ApiObject):
+    def __init__(self, curves):
+        self._curves = list(curves)
+
+    @property
+    def count(self):
+        return len(self._curves)
+
+    def item(self, index: int):
+        return self._curves[index]
+
+    # Closed when every vertex on the path is used an even number of times
+    @property
+    def isClosed(self):
+        uses = {}
+        for curve in self._curves:
+            for vertex in (curve._start, curve._end):
+                uses[id(vertex)] = uses.get(id(vertex), 0) + 1
+        return all(count % 2 == 0 for count in uses.values())
+
+class LoftSections(ApiObject):
+    def __init__(self):
+        self._items = []
+
+    def add(self, entity):
+        self._items.append(entity)
+        return entity
+
+    @property
+    def count(self):
+        return len(self._items)
+
+class LoftFeatureInput(ApiObject):
+    def __init__(self, operation: int):
+        self.operation = operation
+        self.isSolid = True
+        self.loftSections = LoftSections()
+
+class LoftFeature(Feature):
+    pass
+
+class LoftFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+
+    def createInput(self, operation: int):
+        return LoftFeatureInput(operation)
+
+    def add(self, input: LoftFeatureInput):
+        if input.loftSections.count < 2:
+            self._component.parentDesign._compute()
+            raise RuntimeError('3 : A loft needs at least two profiles')
+        return LoftFeature(self._component, [BRepBody(self._component, 'Body', False)])
+
+class PatchFeatureInput(ApiObject):
+    def __init__(self, boundaryCurve, operation: int):
+        self.boundaryCurve = boundaryCurve
+        self.operation = operation
+
+class PatchFeature(Feature):
+    pass
+
+class PatchFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+
+    def createInput(self, boundaryCurve, operation: int):
+        return PatchFeatureInput(boundaryCurve, operation)
+
+    def add(self, input: PatchFeatureInput):
+        if not input.boundaryCurve.isClosed:
+            self._component.parentDesign._compute()
+            raise RuntimeError('3 : The patch boundary is not closed')
+        return PatchFeature(self._component, [BRepBody(self._component, 'Body', False)])
+
+class SurfaceDeleteFaceFeature(Feature):
+    pass
+
+class SurfaceDeleteFaceFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+
+    def add(self, facesToDelete):
+        return SurfaceDeleteFaceFeature(self._component, [BRepBody(self._component, 'Body', False)])
+
+class StitchFeatureInput(ApiObject):
+    def __init__(self, stitchSurfaces, tolerance, operation: int):
+        self.stitchSurfaces = stitchSurfaces
+        self.tolerance = tolerance
+        self.operation = operation
+
+class StitchFeature(Feature):
+    pass
+
+class StitchFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+
+    def createInput(self, stitchSurfaces, tolerance, operation: int):
+        return StitchFeatureInput(stitchSurfaces, tolerance, operation)
+
+    def add(self, input: StitchFeatureInput):
+        return StitchFeature(self._component, [BRepBody(self._component, 'Body', True)])
+
+class ReplaceFaceFeatureInput(ApiObject):
+    def __init__(self, sourceFaces, isTangentChain: bool, targetFaces):
+        self.sourceFaces = sourceFaces
+        self.isTangentChain = isTangentChain
+        self.targetFaces = targetFaces
+
+class ReplaceFaceFeature(Feature):
+    pass
+
+class ReplaceFaceFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+        self.fails = False
+
+    def createInput(self, sourceFaces, isTangentChain: bool, targetFaces):
+        return ReplaceFaceFeatureInput(sourceFaces, isTangentChain, targetFaces)
+
+    # Fails like Fusion does when the new faces don't meet the body, which tests switch on with fails
+    def add(self, input: ReplaceFaceFeatureInput):
+        if self.fails:
+            self._component.parentDesign._compute()
+            raise RuntimeError('3 : The replace face failed')
+        return ReplaceFaceFeature(self._component, [input.sourceFaces.item(0).body])
+
+class RemoveFeature(Feature):
+    pass
+
+class RemoveFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+
+    def add(self, itemToRemove):
+        return RemoveFeature(self._component)
+
+class BaseFeature(Feature):
+    def startEdit(self):
+        return True
+
+    def finishEdit(self):
+        return True
+
+class BaseFeatures(ApiObject):
+    def __init__(self, component):
+        self._component = component
+
+    def add(self):
+        return BaseFeature(self._component)
+
+class Features(ApiObject):
+    def __init__(self, component):
+        self.chamferFeatures = ChamferFeatures(component)
+        self.loftFeatures = LoftFeatures(component)
+        self.patchFeatures = PatchFeatures(component)
+        self.surfaceDeleteFaceFeatures = SurfaceDeleteFaceFeatures(component)
+        self.stitchFeatures = StitchFeatures(component)
+        self.replaceFaceFeatures = ReplaceFaceFeatures(component)
+        self.removeFeatures = RemoveFeatures(component)
+        self.baseFeatures = BaseFeatures(component)
+
+    def createPath(self, curves, isChain: bool = True):
+        return Path(curves if isinstance(curves, ObjectCollection) else [curves])
+
+
+class CustomGraphicsCoordinates(ApiObject):
+    def __init__(self, coordinates):
+        self._coordinates = list(coordinates)
+
+    @staticmethod
+    def create(coordinates):
+        return CustomGraphicsCoordinates(coordinates)
+
+    @property
+    def coordinateCount(self):
+        return len(self._coordinates) // 3
+
+class CustomGraphicsSolidColorEffect(ApiObject):
+    def __init__(self, color):
+        self.color = color
+
+    @staticmethod
+    def create(color):
+        return CustomGraphicsSolidColorEffect(color)
+
+class CustomGraphicsLines(ApiObject):
+    def __init__(self, group, coordinates, indexList, isLineStrip: bool):
+        self.coordinates = coordinates
+        self.indexList = list(indexList)
+        self.isLineStrip = isLineStrip
+        self.color = None
+        self.weight = 1
+        self._group = group
+
+    def deleteMe(self):
+        self._group._entities.remove(self)
+        self._deleted = True
+        return True
+
+class CustomGraphicsGroup(ApiObject):
+    def __init__(self, groups):
+        self._groups = groups
+        self._entities = []
+
+    @property
+    def count(self):
+        return len(self._entities)
+
+    def item(self, index: int):
+        return self._entities[index]
+
+    def addLines(self, coordinates, indexList, isLineStrip: bool, lineStripLengths=None):
+        lines = CustomGraphicsLines(self, coordinates, indexList, isLineStrip)
+        self._entities.append(lines)
+        return lines
+
+    def deleteMe(self):
+        self._groups._items.remove(self)
+        self._deleted = True
+        return True
+
+class CustomGraphicsGroups(ApiObject):
+    def __init__(self):
+        self._items = []
+
+    def add(self):
+        group = CustomGraphicsGroup(self)
+        self._items.append(group)
+        return group
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index: int):
+        return self._items[index]
+
+
+class Component(ApiObject):
+    def __init__(self, design, name: str):
+        self.name = name
+        self._design = design
+        self._featureCounts = {}
+        self.bRepBodies = BRepBodies(self)
+        self.features = Features(self)
+        self.customGraphicsGroups = CustomGraphicsGroups()
+
+    @property
+    def parentDesign(self):
+        return self._design
+
+class Design(ApiObject):
+    def __init__(self, name: str = 'Design', designType: int = DesignTypes.ParametricDesignType):
+        self.designType = designType
+        self.timeline = Timeline()
+        self.unitsManager = UnitsManager()
+        self.parentDocument = None
+        self.computeCount = 0
+        self._tokens = 0
+        self._entities = {}
+        self._attributes = []
+        self.rootComponent = Component(self, name)
+        self._components = [self.rootComponent]
+
+    @property
+    def allComponents(self):
+        return ObjectCollection(self._components)
+
+    @property
+    def activeComponent(self):
+        return self.rootComponent
+
+    def findEntityByToken(self, entityToken: str):
+        entity = self._entities.get(entityToken.split('#')[0])
+        return [entity] if entity is not None and entity._deleted is False else []
+
+    def findAttributes(self, groupName: str, attributeName: str):
+        return [attribute for attribute in self._attributes
+                if attribute.groupName == groupName and attribute.name == attributeName and attribute.isValid and attribute.parent.isValid]
+
+    # Change several parameters with a single recompute
+    def modifyParameters(self, parameters, values):
+        for parameter, value in zip(parameters, values):
+            parameter._value = value.realValue
+        self._compute()
+        return True
+
+    def computeAll(self):
+        self._compute()
+        return True
+
+    # Fake only: add a component to the design
+    def _addComponent(self, name: str):
+        component = Component(self, name)
+        self._components.append(component)
+        return component
+
+    def _compute(self):
+        self.computeCount += 1
+
+    def _newToken(self, kind: str):
+        self._tokens += 1
+        return '{}:{}'.format(kind, self._tokens)
+
+    def _register(self, entity):
+        self._entities[entity.entityToken.split('#')[0]] = entity
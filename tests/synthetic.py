@@ -0,0 +1,63 @@
+# Generators for synthetic designs and bodies built on the fake adsk modules
+import math
+import fakecore, fakefusion
+from fakecore import SurfaceTypes
+
+def NewDesign(name: str = 'Design', designType: int = fakefusion.DesignTypes.ParametricDesignType):
+    return fakefusion.Design(name, designType)
+
+# Add a closed n-sided prism to a body. Every face runs counterclockwise around its outward normal, so each face
+# lies to the left of its coedges as in Fusion. With smoothRims the top and bottom rims are tangent chains, like the
+# edges around a filleted pocket. Returns the top, bottom and side edges.
+def AddPrism(body: fakefusion.BRepBody, sides: int, radius: float = 5.0, height: float = 2.0, center=(0.0, 0.0, 0.0), smoothRims: bool = False):
+    cx, cy, cz = center
+    angles = [2.0 * math.pi * i / sides for i in range(sides)]
+    bottomPoints = [(cx + radius*math.cos(angle), cy + radius*math.sin(angle), cz) for angle in angles]
+    topPoints = [(x, y, cz + height) for x, y, z in bottomPoints]
+    bottom = [body._addVertex(point) for point in bottomPoints]
+    top = [body._addVertex(point) for point in topPoints]
+
+    bottomEdges = [body._addEdge(bottom[i], bottom[(i + 1) % sides]) for i in range(sides)]
+    topEdges = [body._addEdge(top[i], top[(i + 1) % sides]) for i in range(sides)]
+    sideEdges = [body._addEdge(bottom[i], top[i]) for i in range(sides)]
+    if smoothRims:
+        for edge in topEdges:
+            edge._chain = topEdges
+        for edge in bottomEdges:
+            edge._chain = bottomEdges
+
+    body._addFace(SurfaceTypes.PlaneSurfaceType, (0.0, 0.0, 1.0), topPoints, [(edge, False) for edge in topEdges])
+    body._addFace(SurfaceTypes.PlaneSurfaceType, (0.0, 0.0, -1.0), bottomPoints[::-1], [(edge, True) for edge in bottomEdges[::-1]])
+    for i in range(sides):
+        j = (i + 1) % sides
+        middle = 0.5 * (angles[i] + (angles[j] if j else 2.0 * math.pi))
+        body._addFace(SurfaceTypes.PlaneSurfaceType, (math.cos(middle), math.sin(middle), 0.0),
+                      [bottomPoints[i], bottomPoints[j], topPoints[j], topPoints[i]],
+                      [(bottomEdges[i], False), (sideEdges[j], False), (topEdges[i], True), (sideEdges[i], True)])
+    return topEdges, bottomEdges, sideEdges
+
+def PrismBody(component: fakefusion.Component, sides: int, radius: float = 5.0, height: float = 2.0, smoothRims: bool = False, name: str = 'Body'):
+    body = fakefusion.BRepBody(component, name)
+    AddPrism(body, sides, radius, height, smoothRims=smoothRims)
+    component.bRepBodies._items.append(body)
+    return body
+
+# A body with about edgeCount edges, made of separate prism lumps laid out on a grid like bosses on a plate.
+# Returns the body and the top rim edges of each lump.
+def PlateBody(component: fakefusion.Component, edgeCount: int, sides: int = 8, smoothRims: bool = False, name: str = 'Plate'):
+    body = fakefusion.BRepBody(component, name)
+    lumps = max(1, int(math.ceil(edgeCount / (3.0 * sides))))
+    columns = int(math.ceil(math.sqrt(lumps)))
+    rims = []
+    for lump in range(lumps):
+        center = (3.0 * (lump % columns), 3.0 * (lump // columns), 0.0)
+        topEdges, bottomEdges, sideEdges = AddPrism(body, sides, 1.0, 1.0, center, smoothRims)
+        rims.append(topEdges)
+    component.bRepBodies._items.append(body)
+    return body, rims
+
+# Put a design in a document in the fake cloud so it can be opened by id
+def AddCloudDocument(app: fakecore.Application, fileId: str, design: fakefusion.Design, name: str = None):
+    document = fakecore.Document(name or fileId, design)
+    app.data.addFile(fileId, document)
+    return document
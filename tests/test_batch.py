@@ -0,0 +1,63 @@
+# The batch command run end to end against documents in the fake cloud
+import json
+import fakecore, synthetic
+
+def AddPrismDocument(app: fakecore.Application, fileId: str, sides: int = 4):
+    design = synthetic.NewDesign(fileId)
+    synthetic.PrismBody(design.rootComponent, sides)
+    return synthetic.AddCloudDocument(app, fileId, design)
+
+def WriteConfig(tmp_path, documents, **values):
+    configPath = tmp_path / 'batch.json'
+    config = {'documents': documents, 'rule': {'maxLength': 10.0, 'linearOnly': True}, 'width': 0.1}
+    config.update(values)
+    configPath.write_text(json.dumps(config))
+    return configPath
+
+def test_batch_command_is_added_and_removed(addIn):
+    ui = fakecore.Application.get().userInterface
+    panel = ui.allToolbarPanels.itemById('SolidModifyPanel')
+    assert ui.commandDefinitions.itemById('irCleanChamferBatch')
+    assert panel.controls.itemById('irCleanChamferBatch')
+    addIn.stop(None)
+    assert ui.commandDefinitions.itemById('irCleanChamferBatch') is None
+    assert panel.controls.itemById('irCleanChamferBatch') is None
+    addIn.run(None)
+
+def test_batch_command_runs_config(addIn, tmp_path):
+    app = fakecore.Application.get()
+    documents = [AddPrismDocument(app, 'urn:first'), AddPrismDocument(app, 'urn:second', 6)]
+    configPath = WriteConfig(tmp_path, ['urn:first', 'urn:second', 'urn:missing'])
+    app.userInterface.fileDialogPath = str(configPath)
+
+    command = app.userInterface.commandDefinitions.itemById('irCleanChamferBatch').execute()
+    command.doExecute()
+
+    report = json.loads((tmp_path / 'batch-report.json').read_text())
+    assert [docReport['id'] for docReport in report['documents']] == ['urn:first', 'urn:second', 'urn:missing']
+    assert report['documents'][2]['error']
+    for document, docReport in zip(documents, report['documents']):
+        assert docReport['error'] is None
+        assert [result['success'] for result in docReport['bodies']] == [True]
+        assert document.saves == ['Clean chamfer batch']
+        assert not document.isOpen
+    assert 'Clean chamfered 2 of 2 bodies in 3 documents, 1 documents failed.' in app.userInterface.messages[-1]
+
+def test_batch_closes_document_when_save_fails(addIn, tmp_path, monkeypatch):
+    app = fakecore.Application.get()
+    document = AddPrismDocument(app, 'urn:first')
+    def FailingSave(description):
+        raise RuntimeError('Save failed')
+    monkeypatch.setattr(document, 'save', FailingSave)
+    configPath = WriteConfig(tmp_path, ['urn:first'])
+
+    report = addIn.RunBatchFile(str(configPath))
+    assert 'Save failed' in report['documents'][0]['error']
+    assert not document.isOpen
+
+def test_batch_command_cancelled(addIn, tmp_path):
+    app = fakecore.Application.get()
+    command = app.userInterface.commandDefinitions.itemById('irCleanChamferBatch').execute()
+    command.doExecute()
+    assert app.userInterface.messages == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,72 @@
+# Finding the edges that break a chamfer, and how skipped edges reach the user
+import pytest
+import fakecore, synthetic
+from conftest import OpenWithEdges
+
+def PrismEdgeSets(cleanChamfer, failing):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 8)
+    edges = [body.edges.item(i) for i in range(8, 16)]
+    design.rootComponent.features.chamferFeatures.failingEdges = set(edges[i].entityToken for i in failing)
+    return design, edges, [cleanChamfer.EdgeSet(edges[:4], 0.1, 0.0, 'Equal Distance'), cleanChamfer.EdgeSet(edges[4:], 0.2, 0.0, 'Equal Distance')]
+
+@pytest.fixture
+def probes(cleanChamfer, monkeypatch):
+    calls = []
+    chamferSucceeds = cleanChamfer.ChamferSucceeds
+    def CountedChamferSucceeds(parentComponent, edgeSets, chain):
+        calls.append([len(edgeSet.edges) for edgeSet in edgeSets])
+        return chamferSucceeds(parentComponent, edgeSets, chain)
+    monkeypatch.setattr(cleanChamfer, 'ChamferSucceeds', CountedChamferSucceeds)
+    return calls
+
+def test_bisect_skips_the_set_that_already_failed(cleanChamfer, probes):
+    design, edges, edgeSets = PrismEdgeSets(cleanChamfer, [5])
+    failing = cleanChamfer.BisectFailingEdges(design.rootComponent, edgeSets, False)
+    assert failing == [edges[5]]
+    # Two probes per level for eight edges, starting from the halves and going into the failing half first
+    assert probes == [[4], [4], [2], [1], [1], [2]]
+
+def test_bisect_finds_several_edges(cleanChamfer, probes):
+    design, edges, edgeSets = PrismEdgeSets(cleanChamfer, [0, 6, 7])
+    assert cleanChamfer.BisectFailingEdges(design.rootComponent, edgeSets, False) == [edges[0], edges[6], edges[7]]
+
+def test_bisect_keeps_edges_that_only_fail_together(cleanChamfer, probes, monkeypatch):
+    design, edges, edgeSets = PrismEdgeSets(cleanChamfer, [])
+    items = [(edgeSets[0], edge) for edge in edges[:2]]
+    monkeypatch.setattr(cleanChamfer, 'ChamferSucceeds', lambda parentComponent, edgeSets, chain: True)
+    assert cleanChamfer.BisectItems(design.rootComponent, items, False) == items
+
+def test_preview_with_skipped_edges_is_not_the_result(addIn):
+    design, edges, edgeSets = PrismEdgeSets(addIn, [2])
+    command = OpenWithEdges(design, edges[:4])
+    args = command.executePreview.fire(fakecore.CommandEventArgs(command))
+    assert not args.isValidResult
+
+    # OK then runs execute, which tells the user about the skipped edge
+    ui = fakecore.Application.get().userInterface
+    command.doExecute()
+    assert any(message.startswith('Some edges could not be chamfered and were skipped') for message in ui.messages)
+
+def test_clean_preview_is_the_result(addIn):
+    design, edges, edgeSets = PrismEdgeSets(addIn, [])
+    command = OpenWithEdges(design, edges[:4])
+    args = command.executePreview.fire(fakecore.CommandEventArgs(command))
+    assert args.isValidResult
+    command.cancel()
+
+def test_failing_edges_are_bisected_once(addIn, probes):
+    design, edges, edgeSets = PrismEdgeSets(addIn, [2])
+    command = OpenWithEdges(design, edges[:4])
+    command.doExecutePreview()
+    assert probes
+    bisectProbes = len(probes)
+
+    # Later passes and OK leave out the edge the first pass found, and still report it
+    command.doExecutePreview()
+    command.doExecutePreview()
+    ui = fakecore.Application.get().userInterface
+    command.doExecute()
+    assert len(probes) == bisectProbes
+    assert any(message.startswith('Some edges could not be chamfered and were skipped') for message in ui.messages)
+    assert any('chamfer failed' in line for line in ui.palettes.itemById('TextCommands').lines)
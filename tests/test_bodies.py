@@ -0,0 +1,44 @@
+# Splitting edge sets by body when a body's entity token is not stable
+import fakecore, synthetic
+
+def test_fake_body_tokens_change_between_reads():
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 4)
+    first, second = body.entityToken, body.entityToken
+    assert first != second
+    assert design.findEntityByToken(first) == design.findEntityByToken(second) == [body]
+
+def test_edge_sets_are_grouped_by_body(cleanChamfer):
+    design = synthetic.NewDesign()
+    first = synthetic.PrismBody(design.rootComponent, 4, name='First')
+    second = synthetic.PrismBody(design.rootComponent, 4, name='Second')
+    edgeSets = [cleanChamfer.EdgeSet([first.edges.item(4), second.edges.item(4), first.edges.item(5)], 0.1, 0.0, 'Equal Distance'),
+                cleanChamfer.EdgeSet([first.edges.item(6)], 0.2, 0.0, 'Equal Distance')]
+    groups = cleanChamfer.GroupEdgeSetsByBody(edgeSets)
+    assert [body for body, bodySets in groups] == [first, second]
+
+    firstSets = groups[0][1]
+    assert [edgeSet.edges for edgeSet in firstSets] == [[first.edges.item(4), first.edges.item(5)], [first.edges.item(6)]]
+    assert [edgeSet.widVal for edgeSet in firstSets] == [0.1, 0.2]
+    assert [edgeSet.edges for edgeSet in groups[1][1]] == [[second.edges.item(4)]]
+
+def test_one_body_is_chamfered_in_one_pass(cleanChamfer):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 4)
+    edges = [body.edges.item(i) for i in range(4, 8)]
+    results = cleanChamfer.CleanChamferEdges(edges, 0.1, 0.0, 'Equal Distance', False)
+    assert [(result['edges'], result['success']) for result in results] == [(4, True)]
+
+def test_unselect_finds_edges_when_tokens_change(addIn):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 4, smoothRims=True)
+    app = fakecore.Application.get()
+    app.activeProduct = design
+    command = app.userInterface.commandDefinitions.itemById('irCleanChamferCreate').execute()
+    edgeInput = command.commandInputs.itemById('edges')
+    command.select.fire(fakecore.SelectionEventArgs(fakecore.Selection(body.edges.item(4)), edgeInput))
+    assert len(addIn._selectionSet) == 4
+
+    command.unselect.fire(fakecore.SelectionEventArgs(fakecore.Selection(body.edges.item(4)), edgeInput))
+    assert len(addIn._selectionSet) == 0
+    command.cancel()
@@ -0,0 +1,53 @@
+# Editing the sizes of a stored clean chamfer in place, and committing one as a base feature instead
+import math
+import synthetic
+
+def StoredChamfer(cleanChamfer):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 8)
+    edgeSets = [cleanChamfer.EdgeSet([body.edges.item(8)], 0.1, 0.0, 'Equal Distance'),
+                cleanChamfer.EdgeSet([body.edges.item(12)], 0.1, math.radians(40.0), 'Distance and Angle')]
+    results = cleanChamfer.CleanChamferEdgeSets(edgeSets, False)
+    assert [result['success'] for result in results] == [True]
+    chamfers = cleanChamfer.FindCleanChamfers(design)
+    assert len(chamfers) == 1
+    return design, chamfers[0]
+
+def test_update_sets_every_size_in_one_compute(cleanChamfer):
+    design, (chamfer, parameters) = StoredChamfer(cleanChamfer)
+    computes = design.computeCount
+    cleanChamfer.UpdateCleanChamfer(chamfer, parameters, [(0.2, 0.0), (0.15, math.radians(50.0))])
+    assert design.computeCount == computes + 1
+
+    equalSet, angleSet = chamfer.edgeSets.item(0), chamfer.edgeSets.item(1)
+    assert equalSet.distance.value == 0.2
+    assert angleSet.distance.value == 0.15
+    assert angleSet.angle.value == math.radians(50.0)
+    assert [(storedSet['width'], storedSet['angle']) for storedSet in parameters['edgeSets']] == [(0.2, 0.0), (0.15, math.radians(50.0))]
+
+def test_unchanged_sizes_do_not_compute(cleanChamfer):
+    design, (chamfer, parameters) = StoredChamfer(cleanChamfer)
+    computes = design.computeCount
+    cleanChamfer.UpdateCleanChamfer(chamfer, parameters, [(0.1, 0.0), (0.1, math.radians(40.0))])
+    assert design.computeCount == computes
+
+def test_base_feature_replaces_the_chamfer_features(cleanChamfer):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 8)
+    results = cleanChamfer.CleanChamferEdges([body.edges.item(i) for i in range(8, 16)], 0.1, 0.0, 'Equal Distance', False, True, True)
+    assert [result['success'] for result in results] == [True]
+    features = results[0]['features']
+    assert [type(feature).__name__ for feature in features] == ['BaseFeature', 'RemoveFeature']
+    assert [design.timeline.item(i).entity for i in range(design.timeline.count)] == features
+
+    # The finished body keeps its name, and there is no stored clean chamfer left to edit
+    bodies = design.rootComponent.bRepBodies
+    assert bodies.item(bodies.count - 1).name == body.name
+    assert cleanChamfer.FindCleanChamfers(design) == []
+
+def test_base_feature_leaves_direct_designs_alone(cleanChamfer):
+    design = synthetic.NewDesign(designType=synthetic.fakefusion.DesignTypes.DirectDesignType)
+    body = synthetic.PrismBody(design.rootComponent, 8)
+    results = cleanChamfer.CleanChamferEdges([body.edges.item(8)], 0.1, 0.0, 'Equal Distance', False, True, True)
+    assert [result['success'] for result in results] == [True]
+    assert 'BaseFeature' not in [type(feature).__name__ for feature in results[0]['features']]
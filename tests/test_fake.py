@@ -0,0 +1,42 @@
+import io, math, os, sys
+import fakeadsk, synthetic
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'benchmarks'))
+import bench_pipeline
+
+def test_prism_is_closed_and_convex(cleanChamfer):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 6)
+    assert body.edges.count == 18
+    assert body.faces.count == 8
+    assert all(edge.faces.count == 2 for edge in body.edges)
+
+    # Every edge of a right prism is convex, at 90 degrees between the caps and sides and 120 between the sides
+    table = cleanChamfer.EdgeTable(body)
+    angles = sorted(round(math.degrees(cleanChamfer.EdgeDihedral(table.tangents[i], table.normalsA[i], table.normalsB[i])[0]))
+                    for i in range(len(table.edges)))
+    assert angles == [90] * 12 + [120] * 6
+    assert cleanChamfer.ClassifyEdges(table, cleanChamfer.EdgeRule()) == list(range(18))
+
+def test_temp_ids_are_per_body():
+    design = synthetic.NewDesign()
+    first = synthetic.PrismBody(design.rootComponent, 4)
+    second = synthetic.PrismBody(design.rootComponent, 4)
+    assert [edge.tempId for edge in first.edges] == [edge.tempId for edge in second.edges]
+    assert first.edges.item(0).entityToken != second.edges.item(0).entityToken
+
+def test_api_calls_are_counted():
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 4)
+    fakeadsk.resetApiCalls()
+    body.edges.item(0).length
+    assert fakeadsk.apiCalls() == 3
+
+def test_benchmarks_run():
+    out = io.StringIO()
+    rows = bench_pipeline.Run(100, out=out)
+    names = set(name for edgeCount, name, seconds, apiCalls, computes, size in rows)
+    assert {'loops.build', 'select.classify', 'pipeline.chamfer', 'pipeline.snapshot', 'pipeline.stitch.stitch',
+            'pipeline.surface.loft', 'pipeline.edges.surface.patch',
+            'recompute.parametric.computeAll', 'recompute.baseFeature.computeAll'} <= names
+    assert 'pipeline.total' in out.getvalue()
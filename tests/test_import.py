@@ -0,0 +1,7 @@
+import fakeadsk
+
+# Fusion evaluates the whole module before calling run, so anything that fails at import time stops the add-in loading
+def test_module_loads():
+    module = fakeadsk.loadAddIn()
+    assert callable(module.run)
+    assert callable(module.stop)
@@ -0,0 +1,59 @@
+# BuildBoundaryLoops against a pure-Python stand-in for the snapshot's edge to vertex table
+
+class Topology:
+    def __init__(self, edgeVerts):
+        self.edgeVerts = edgeVerts
+
+def assertConnected(topology, loop, closed):
+    for edgeId, nextId in zip(loop, loop[1:]):
+        assert set(topology.edgeVerts[edgeId]) & set(topology.edgeVerts[nextId])
+    if closed and len(loop) > 1:
+        assert set(topology.edgeVerts[loop[0]]) & set(topology.edgeVerts[loop[-1]])
+
+def test_closed_loop(cleanChamfer):
+    # A square, with edges listed out of order and against the loop direction
+    topology = Topology([(0, 1), (2, 1), (2, 3), (0, 3)])
+    loops = cleanChamfer.BuildBoundaryLoops(topology, [2, 0, 3, 1])
+    assert len(loops) == 1
+    assert sorted(loops[0]) == [0, 1, 2, 3]
+    assertConnected(topology, loops[0], True)
+
+def test_open_chain_starts_at_free_end(cleanChamfer):
+    topology = Topology([(0, 1), (1, 2), (3, 2), (3, 4)])
+    loops = cleanChamfer.BuildBoundaryLoops(topology, [1, 3, 0, 2])
+    assert len(loops) == 1
+    assert loops[0] in ([0, 1, 2, 3], [3, 2, 1, 0])
+
+def test_self_loop_circle_edge(cleanChamfer):
+    # A full circle is one edge that starts and ends on the same vertex
+    topology = Topology([(5, 5)])
+    assert cleanChamfer.BuildBoundaryLoops(topology, [0]) == [[0]]
+
+def test_three_and_more_loops(cleanChamfer):
+    topology = Topology([
+        (0, 1), (1, 2), (2, 0),         # triangle
+        (10, 11), (11, 12), (12, 13),   # open chain
+        (20, 20),                       # circle
+        (30, 31), (31, 32), (32, 33), (33, 30)])  # square
+    edgeIds = [9, 4, 0, 6, 2, 7, 5, 1, 10, 3, 8]
+    loops = cleanChamfer.BuildBoundaryLoops(topology, edgeIds)
+    assert len(loops) == 4
+    assert sorted(edgeId for loop in loops for edgeId in loop) == list(range(11))
+    loopSets = sorted(sorted(loop) for loop in loops)
+    assert loopSets == [[0, 1, 2], [3, 4, 5], [6], [7, 8, 9, 10]]
+    for loop in loops:
+        assertConnected(topology, loop, 3 not in loop)
+
+def test_repeated_edge_ids_are_ignored(cleanChamfer):
+    topology = Topology([(0, 1), (1, 2), (2, 0)])
+    loops = cleanChamfer.BuildBoundaryLoops(topology, [0, 1, 1, 2, 0])
+    assert len(loops) == 1
+    assert sorted(loops[0]) == [0, 1, 2]
+
+def test_long_chain_is_linear(cleanChamfer):
+    # A single loop of 100k edges walks without recursion or quadratic lookups
+    count = 100000
+    topology = Topology([(i, (i + 1) % count) for i in range(count)])
+    loops = cleanChamfer.BuildBoundaryLoops(topology, list(range(count))[::-1])
+    assert len(loops) == 1
+    assert len(loops[0]) == count
@@ -0,0 +1,59 @@
+# OffsetBoundaryPolylines against prism edges and cylinder rims whose chamfer boundaries are known exactly
+import math
+import pytest
+
+def assertPoints(actual, expected):
+    assert len(actual) == len(expected)
+    for point, expectedPoint in zip(actual, expected):
+        assert point == pytest.approx(expectedPoint, abs=1e-9)
+
+def test_box_edge(cleanChamfer):
+    # Top edge of a box running along +y at x = 2, z = 1, between the top face and the +x side face
+    points = [(2.0, y, 1.0) for y in (0.0, 0.5, 1.0)]
+    tangents = [(0.0, 1.0, 0.0)] * 3
+    widthA, widthB = cleanChamfer.ChamferOffsetWidths(0.1, 0.0, 'Equal Distance')
+    boundaryA, boundaryB = cleanChamfer.OffsetBoundaryPolylines(points, tangents, [(0.0, 0.0, 1.0)] * 3, [(1.0, 0.0, 0.0)] * 3, widthA, widthB)
+    assertPoints(boundaryA, [(1.9, y, 1.0) for y in (0.0, 0.5, 1.0)])
+    assertPoints(boundaryB, [(2.0, y, 0.9) for y in (0.0, 0.5, 1.0)])
+
+def test_box_edge_distance_and_angle(cleanChamfer):
+    widthA, widthB = cleanChamfer.ChamferOffsetWidths(0.1, math.radians(60.0), 'Distance and Angle')
+    assert widthB == pytest.approx(0.1 * math.sqrt(3.0))
+    boundaryA, boundaryB = cleanChamfer.OffsetBoundaryPolylines([(2.0, 0.0, 1.0)], [(0.0, 3.0, 0.0)], [(0.0, 0.0, 1.0)], [(1.0, 0.0, 0.0)], widthA, widthB)
+    assertPoints(boundaryA, [(1.9, 0.0, 1.0)])
+    assertPoints(boundaryB, [(2.0, 0.0, 1.0 - 0.1 * math.sqrt(3.0))])
+
+def test_hexagonal_prism_side_edge(cleanChamfer):
+    # Vertical edge of a hexagonal prism at (r, 0), where the side faces meet at 120 degrees.
+    # Each boundary runs along its face toward the next corner of the hexagon.
+    normalA = (math.cos(math.radians(-30.0)), math.sin(math.radians(-30.0)), 0.0)
+    normalB = (math.cos(math.radians(30.0)), math.sin(math.radians(30.0)), 0.0)
+    boundaryA, boundaryB = cleanChamfer.OffsetBoundaryPolylines([(3.0, 0.0, 0.5)], [(0.0, 0.0, 1.0)], [normalA], [normalB], 0.2, 0.2)
+    assertPoints(boundaryA, [(3.0 - 0.1, -0.2 * math.sin(math.radians(60.0)), 0.5)])
+    assertPoints(boundaryB, [(3.0 - 0.1, 0.2 * math.sin(math.radians(60.0)), 0.5)])
+
+def test_cylinder_rim(cleanChamfer):
+    # Top rim of a cylinder of radius 2 at z = 1. The top face boundary runs counterclockwise, and the derivative
+    # of the circle by angle has length equal to the radius.
+    radius = 2.0
+    angles = [2.0 * math.pi * i / 12 for i in range(12)]
+    points = [(radius*math.cos(angle), radius*math.sin(angle), 1.0) for angle in angles]
+    tangents = [(-radius*math.sin(angle), radius*math.cos(angle), 0.0) for angle in angles]
+    normalsA = [(0.0, 0.0, 1.0)] * len(angles)
+    normalsB = [(math.cos(angle), math.sin(angle), 0.0) for angle in angles]
+    boundaryA, boundaryB = cleanChamfer.OffsetBoundaryPolylines(points, tangents, normalsA, normalsB, 0.1, 0.3)
+    assertPoints(boundaryA, [(1.9*math.cos(angle), 1.9*math.sin(angle), 1.0) for angle in angles])
+    assertPoints(boundaryB, [(radius*math.cos(angle), radius*math.sin(angle), 0.7) for angle in angles])
+
+def test_hole_rim(cleanChamfer):
+    # Rim of a hole of radius 2 in a top face at z = 1. The top face runs clockwise around the hole and the hole
+    # wall faces inward, so one boundary grows away from the hole and the other runs down the wall.
+    radius = 2.0
+    angles = [2.0 * math.pi * i / 8 for i in range(8)]
+    points = [(radius*math.cos(angle), radius*math.sin(angle), 1.0) for angle in angles]
+    tangents = [(math.sin(angle), -math.cos(angle), 0.0) for angle in angles]
+    normalsA = [(0.0, 0.0, 1.0)] * len(angles)
+    normalsB = [(-math.cos(angle), -math.sin(angle), 0.0) for angle in angles]
+    boundaryA, boundaryB = cleanChamfer.OffsetBoundaryPolylines(points, tangents, normalsA, normalsB, 0.1, 0.1)
+    assertPoints(boundaryA, [(2.1*math.cos(angle), 2.1*math.sin(angle), 1.0) for angle in angles])
+    assertPoints(boundaryB, [(radius*math.cos(angle), radius*math.sin(angle), 0.9) for angle in angles])
@@ -0,0 +1,67 @@
+# The create command's preview pass: what it writes and what it caches
+import json
+import fakecore, synthetic
+from conftest import OpenWithEdges
+
+def PrismDesign(sides: int = 4):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, sides)
+    return design, body
+
+def TextLines():
+    return fakecore.Application.get().userInterface.palettes.itemById('TextCommands').lines
+
+def test_preview_writes_nothing(addIn):
+    design, body = PrismDesign()
+    command = OpenWithEdges(design, [body.edges.item(4)])
+    for i in range(3):
+        command.doExecutePreview()
+    assert TextLines() == []
+
+    command.doExecute()
+    assert any(line.startswith('Clean Chamfer: Design / Body: 1 edges, done') for line in TextLines())
+
+def test_profiling_logs_the_snapshot(addIn, monkeypatch, tmp_path):
+    # Keep the profile log out of the add-in folder
+    monkeypatch.setattr(addIn._profiler, 'logPath', str(tmp_path / 'Profile' / 'clean-chamfer-profile.log'))
+    monkeypatch.setattr(addIn._profiler, 'enabled', True)
+    design, body = PrismDesign()
+    command = OpenWithEdges(design, [body.edges.item(4)])
+    command.doExecutePreview()
+    assert any(line.startswith('Clean Chamfer: topology snapshot made') for line in TextLines())
+    assert addIn._profiler.lastSummary.endswith('api calls are only counted for: snapshot')
+    command.cancel()
+    addIn._profiler.close()
+    run = json.loads((tmp_path / 'Profile' / 'clean-chamfer-profile.log').read_text().splitlines()[0])
+    assert run['apiCallsCounted'] == ['snapshot']
+    assert [phase['apiCalls'] is not None for phase in run['phases']].count(True) == 1
+
+def TwoBodyDesign():
+    design = synthetic.NewDesign()
+    bodies = [synthetic.PrismBody(design.rootComponent, 4, name=name) for name in ('First', 'Second')]
+    assert bodies[0].edges.item(4).tempId == bodies[1].edges.item(4).tempId
+    return design, bodies
+
+def test_preview_key_tells_bodies_apart(addIn):
+    design, bodies = TwoBodyDesign()
+    command = OpenWithEdges(design, [bodies[0].edges.item(4)])
+    edgeInput = command.commandInputs.itemById('edges')
+    keys = [addIn.PreviewKey(design, command.commandInputs)]
+    edgeInput.clearSelection()
+    edgeInput.addSelection(bodies[1].edges.item(4))
+    keys.append(addIn.PreviewKey(design, command.commandInputs))
+    assert keys[0] != keys[1]
+    command.cancel()
+
+def test_failure_on_one_body_does_not_block_another(addIn):
+    design, bodies = TwoBodyDesign()
+    design.rootComponent.features.chamferFeatures.failingEdges = {bodies[0].edges.item(4).entityToken}
+    command = OpenWithEdges(design, [bodies[0].edges.item(4)])
+    assert not command.executePreview.fire(fakecore.CommandEventArgs(command)).isValidResult
+
+    # The same edge of the other body has the same temp id but must still be built
+    edgeInput = command.commandInputs.itemById('edges')
+    edgeInput.clearSelection()
+    edgeInput.addSelection(bodies[1].edges.item(4))
+    assert command.executePreview.fire(fakecore.CommandEventArgs(command)).isValidResult
+    command.cancel()
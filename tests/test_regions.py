@@ -0,0 +1,68 @@
+# Region plans only patch chamfer faces that lie in one plane
+import math
+import pytest
+import fakeadsk, synthetic
+
+def PlanChamfer(cleanChamfer, edges):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 4)
+    topEdges = [body.edges.item(i) for i in range(4, 8)]
+    chamfer = cleanChamfer.AddChamfer(design.rootComponent, [cleanChamfer.EdgeSet([topEdges[i] for i in edges], 0.1, 0.0, 'Equal Distance')], False)
+    return cleanChamfer.PlanRegions(cleanChamfer.TopologySnapshot(chamfer.faces))
+
+def test_single_face_is_patched(cleanChamfer):
+    plans = PlanChamfer(cleanChamfer, [0])
+    assert [(plan.kind, len(plan.faceIds), len(plan.loops)) for plan in plans] == [('patch', 1, 1)]
+
+def test_open_chain_around_a_corner_is_lofted(cleanChamfer):
+    # Two planar chamfer faces meeting at a corner make one open loop but do not share a plane
+    plans = PlanChamfer(cleanChamfer, [0, 1])
+    assert [(plan.kind, len(plan.faceIds), len(plan.loops)) for plan in plans] == [('loft', 2, 1)]
+
+def test_closed_ring_is_lofted(cleanChamfer):
+    plans = PlanChamfer(cleanChamfer, [0, 1, 2, 3])
+    assert [(plan.kind, len(plan.faceIds), len(plan.loops)) for plan in plans] == [('loft', 4, 2)]
+
+def test_opposite_edges_are_separate_patches(cleanChamfer):
+    plans = PlanChamfer(cleanChamfer, [0, 2])
+    assert [plan.kind for plan in plans] == ['patch', 'patch']
+
+def test_snapshot_reads_planes(cleanChamfer):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 4, height=2.0)
+    snapshot = cleanChamfer.TopologySnapshot([body.faces.item(0)])
+    normal, offset = snapshot.facePlanes[0]
+    assert normal == pytest.approx((0.0, 0.0, 1.0))
+    assert offset == pytest.approx(2.0)
+
+def test_snapshot_counts_the_calls_it_makes(cleanChamfer):
+    design = synthetic.NewDesign()
+    body = synthetic.PrismBody(design.rootComponent, 8)
+    chamfer = cleanChamfer.AddChamfer(design.rootComponent, [cleanChamfer.EdgeSet([body.edges.item(i) for i in range(8, 16)], 0.1, 0.0, 'Equal Distance')], False)
+    faces = chamfer.faces
+    fakeadsk.resetApiCalls()
+    snapshot = cleanChamfer.TopologySnapshot(faces)
+    assert snapshot.apiCalls == fakeadsk.apiCalls()
+
+def test_coplanar_faces_are_patched(cleanChamfer):
+    tilted = cleanChamfer.Normalize((1.0, 0.0, 1.0))
+    plane = (tilted, 0.5)
+    flipped = (tuple(-value for value in tilted), -0.5)
+    plan = cleanChamfer.RegionPlan([0, 1, 2], [[0, 1, 2, 3]], [plane, flipped, plane])
+    assert plan.kind == 'patch'
+
+@pytest.mark.parametrize('planes', [
+    [((0.0, 0.0, 1.0), 1.0), ((0.0, 0.0, 1.0), 1.1)],
+    [((0.0, 0.0, 1.0), 1.0), ((0.0, math.sin(0.01), math.cos(0.01)), 1.0)],
+    [((0.0, 0.0, 1.0), 1.0), None],
+    [None]
+])
+def test_other_regions_are_lofted(cleanChamfer, planes):
+    plan = cleanChamfer.RegionPlan(list(range(len(planes))), [[0, 1, 2]], planes)
+    assert plan.kind == 'loft'
+
+def test_two_loops_are_lofted(cleanChamfer):
+    plane = ((0.0, 0.0, 1.0), 1.0)
+    plan = cleanChamfer.RegionPlan([0], [[0, 1], [2, 3]], [plane])
+    assert plan.kind == 'loft'
+    assert plan.sections == [[0, 1], [2, 3]]
@@ -0,0 +1,58 @@
+# Opening and closing the commands over and over must not leave handlers, graphics or collections behind
+import fakecore, synthetic
+
+_cycles = 1000
+
+def ActiveDesign():
+    design = synthetic.NewDesign()
+    synthetic.PrismBody(design.rootComponent, 6, smoothRims=True)
+    fakecore.Application.get().activeProduct = design
+    return design
+
+def LiveCounts(addIn, design):
+    counts = addIn.SessionCounts()
+    counts['eventHandlers'] = fakecore.Event.liveHandlers
+    counts['designGroups'] = len(design.rootComponent.customGraphicsGroups._items)
+    return counts
+
+# Open the create command, pick a rim, draw its fast preview and close the dialog
+def CreateCycle(addIn, design):
+    command = fakecore.Application.get().userInterface.commandDefinitions.itemById('irCleanChamferCreate').execute()
+    inputs = command.commandInputs
+    edgeInput = inputs.itemById('edges')
+    edge = design.rootComponent.bRepBodies.item(0).edges.item(0)
+    command.select.fire(fakecore.SelectionEventArgs(fakecore.Selection(edge), edgeInput))
+    inputs.itemById('fastPreview').value = True
+    command.doExecutePreview()
+    assert len(design.rootComponent.customGraphicsGroups._items) == 1
+    command.cancel()
+
+def test_create_cycles_stay_flat(addIn):
+    design = ActiveDesign()
+    CreateCycle(addIn, design)
+    baseline = LiveCounts(addIn, design)
+    assert baseline['sessionHandlers'] == 0
+    assert baseline['graphicsGroups'] == 0
+    assert baseline['designGroups'] == 0
+    for i in range(_cycles):
+        CreateCycle(addIn, design)
+    assert LiveCounts(addIn, design) == baseline
+    assert len(addIn._handlers) == 4
+
+def test_edit_and_batch_cycles_stay_flat(addIn):
+    design = ActiveDesign()
+    definitions = fakecore.Application.get().userInterface.commandDefinitions
+    baseline = LiveCounts(addIn, design)
+    for i in range(_cycles):
+        definitions.itemById('irCleanChamferEdit').execute().cancel()
+        definitions.itemById('irCleanChamferBatch').execute().doExecute()
+    assert LiveCounts(addIn, design) == baseline
+
+def test_stop_releases_everything(addIn):
+    design = ActiveDesign()
+    command = fakecore.Application.get().userInterface.commandDefinitions.itemById('irCleanChamferCreate').execute()
+    addIn.stop(None)
+    assert addIn.SessionCounts()['sessionHandlers'] == 0
+    assert all(not event._handlers for event in command._events)
+    assert addIn._handlers == []
+    addIn.run(None)